@@ -9,7 +9,7 @@ It does NOT diagnose medical conditions. All assessments should be reviewed
 by qualified healthcare professionals.
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 from .symptoms_data import (
     SYMPTOM_CONDITIONS_MAP,
     CRITICAL_SYMPTOMS,
@@ -19,6 +19,22 @@ from .symptoms_data import (
 )
 
 
+def _build_alias_lookup() -> Dict[str, str]:
+    """Map every normalized alias to its canonical key (first definition wins)."""
+    lookup = {}
+    for canonical_key, aliases in SYMPTOM_ALIASES.items():
+        for alias in aliases:
+            lookup.setdefault(alias.lower().replace(" ", "_"), canonical_key)
+    return lookup
+
+
+# Precomputed once at import so per-symptom lookups are O(1)
+ALIAS_LOOKUP = _build_alias_lookup()
+KNOWN_SYMPTOMS = frozenset(SYMPTOM_CONDITIONS_MAP).union(
+    CRITICAL_SYMPTOMS, MODERATE_SYMPTOMS, COMMON_SYMPTOMS
+)
+
+
 def normalize_symptom(symptom: str) -> str:
     """
     Normalize symptom string by converting to lowercase, removing extra spaces,
@@ -41,12 +57,7 @@ def normalize_symptom(symptom: str) -> str:
         return cleaned
     
     # Check aliases
-    for canonical_key, aliases in SYMPTOM_ALIASES.items():
-        for alias in aliases:
-            if alias.lower().replace(" ", "_") == cleaned:
-                return canonical_key
-    
-    return cleaned
+    return ALIAS_LOOKUP.get(cleaned, cleaned)
 
 
 def calculate_risk_score(symptoms: List[str]) -> int:
@@ -151,7 +162,7 @@ def get_advisory_message(risk_level: str, matched_conditions: Dict[str, int]) ->
     return messages.get(risk_level, "Please consult a healthcare provider for proper evaluation.")
 
 
-def evaluate_symptoms(symptoms: List[str]) -> Dict:
+def evaluate_symptoms(symptoms: Iterable[str]) -> Dict:
     """
     Main function to evaluate a list of reported symptoms.
     
@@ -165,7 +176,7 @@ def evaluate_symptoms(symptoms: List[str]) -> Dict:
     a medical diagnosis. All findings should be reviewed by qualified healthcare professionals.
     
     Args:
-        symptoms (List[str]): List of symptom strings (e.g., ["fever", "cough"])
+        symptoms (Iterable[str]): Symptom strings (e.g., ["fever", "cough"])
         
     Returns:
         Dict with keys:
@@ -181,6 +192,9 @@ def evaluate_symptoms(symptoms: List[str]) -> Dict:
         ValueError: If symptoms list is empty or None
     """
     
+    # Materialize once so any iterable can be validated and reported back
+    symptoms = list(symptoms) if symptoms is not None else []
+    
     # Input validation
     if not symptoms:
         return {
@@ -207,7 +221,7 @@ def evaluate_symptoms(symptoms: List[str]) -> Dict:
         normalized = normalize_symptom(symptom)
         
         # Check if symptom is recognized
-        if normalized in SYMPTOM_CONDITIONS_MAP or normalized in CRITICAL_SYMPTOMS or normalized in MODERATE_SYMPTOMS or normalized in COMMON_SYMPTOMS:
+        if normalized in KNOWN_SYMPTOMS:
             normalized_symptoms.append(normalized)
         else:
             unknown_symptoms.append(symptom)
@@ -227,19 +227,25 @@ class AppointmentService:
             timezone.datetime.combine(date, timezone.datetime.min.time().replace(hour=17))
         )
         
+        day_start = current_time
+
+        # Fetch the day's active bookings once and bucket them by slot index
+        booked_times = Appointment.objects.filter(
+            doctor=doctor,
+            appointment_date__gte=day_start,
+            appointment_date__lt=end_time + slot_duration,
+            status__in=['PENDING', 'CONFIRMED']
+        ).values_list('appointment_date', flat=True)
+        booked_slots = {(booked - day_start) // slot_duration for booked in booked_times}
+
+        slot_index = 0
         while current_time <= end_time and len(available_slots) < num_slots:
             # Check if slot is available
-            conflicting = Appointment.objects.filter(
-                doctor=doctor,
-                appointment_date__lt=current_time + slot_duration,
-                appointment_date__gte=current_time,
-                status__in=['PENDING', 'CONFIRMED']
-            ).exists()
-            
-            if not conflicting:
+            if slot_index not in booked_slots:
                 available_slots.append(current_time)
-            
+
             current_time += slot_duration
+            slot_index += 1
         
         return available_slots
     
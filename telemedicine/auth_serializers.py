@@ -46,7 +46,7 @@ class LoginSerializer(serializers.Serializer):
         password = attrs.get('password')
         
         try:
-            user = User.objects.get(username=username)
+            user = User.objects.select_related('patient', 'doctor').get(username=username)
         except User.DoesNotExist:
             raise serializers.ValidationError("Invalid username or password")
         
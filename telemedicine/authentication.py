@@ -0,0 +1,93 @@
+"""
+Authentication backends for the telemedicine API.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+BLACKLIST_CACHE_KEY = 'jti:blk:{jti}'
+
+
+def cache_blacklisted_token(token):
+    """
+    Record a revoked access token's jti in the cache until the token expires.
+
+    The entry only needs to outlive the token itself, after which the
+    signature check rejects it anyway. Revocation is only as shared as the
+    cache: with LocMemCache it holds in the process that handled the logout,
+    so other workers keep accepting the token until it expires.
+    """
+    jti = token.get(api_settings.JTI_CLAIM)
+    if not jti:
+        return
+    timeout = int(token.get('exp', 0) - time.time())
+    if timeout > 0:
+        cache.set(BLACKLIST_CACHE_KEY.format(jti=jti), 1, timeout=timeout)
+
+
+def is_token_blacklisted(token):
+    """Check the cache for a revoked token's jti."""
+    jti = token.get(api_settings.JTI_CLAIM)
+    return bool(jti) and cache.get(BLACKLIST_CACHE_KEY.format(jti=jti)) is not None
+
+
+class ProfileJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that loads the user's patient/doctor profile up front.
+
+    Views resolve the caller's role through hasattr(user, 'patient') and
+    hasattr(user, 'doctor'). Loading both reverse one-to-ones with the user
+    turns each of those probes into a cache hit instead of a query.
+
+    Tokens revoked at logout are rejected from the cache before any
+    database work is done.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_token_blacklisted(validated_token):
+            raise InvalidToken('Token is blacklisted')
+        return validated_token
+
+    def get_user(self, validated_token):
+        """
+        JWTAuthentication.get_user with the profiles joined into the lookup.
+
+        Mirrors simplejwt 5.5 (user id claim, active and revoke checks and
+        their messages); CHECK_REVOKE_TOKEN is honoured when the installed
+        version defines it.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        try:
+            user = self.user_model.objects.select_related('patient', 'doctor').get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        if getattr(api_settings, 'CHECK_USER_IS_ACTIVE', True) and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            from rest_framework_simplejwt.utils import get_md5_hash_password
+
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
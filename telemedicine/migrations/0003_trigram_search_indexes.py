@@ -0,0 +1,41 @@
+# Hand-written migration for trigram search indexes (PostgreSQL only)
+
+from django.db import migrations
+
+
+# Django compiles icontains to UPPER(col) LIKE UPPER(%s) on PostgreSQL,
+# so the trigram indexes are built on the same UPPER() expression.
+TRIGRAM_INDEXES = [
+    ('medicine_name_trgm', 'telemedicine_medicine', 'name'),
+    ('pharmacy_name_trgm', 'telemedicine_pharmacy', 'name'),
+    ('pharmacy_location_trgm', 'telemedicine_pharmacy', 'location'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} '
+            f'ON {table} USING gin (UPPER({column}) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _table, _column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telemedicine', '0002_add_sync_metadata_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
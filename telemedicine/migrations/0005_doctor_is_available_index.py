@@ -0,0 +1,17 @@
+# Hand-written migration for the available-doctors index
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telemedicine', '0004_appointment_status_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(fields=['is_available'], name='doctor_is_available_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Hand-written migration for the doctor's-patients lookup index
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telemedicine', '0005_doctor_is_available_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', 'patient'], name='appt_doctor_patient_idx'),
+        ),
+    ]
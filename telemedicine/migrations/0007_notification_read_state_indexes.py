@@ -0,0 +1,25 @@
+# Hand-written migration for notification inbox and unread-count indexes
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telemedicine', '0006_appointment_doctor_patient_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_read_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(
+                fields=['user', '-created_at'],
+                name='notif_user_unread_idx',
+                condition=models.Q(is_read=False)
+            ),
+        ),
+    ]
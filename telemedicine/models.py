@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.core.cache import cache
 
 class Patient(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -42,6 +43,7 @@ class Doctor(models.Model):
         indexes = [
             models.Index(fields=['updated_at']),
             models.Index(fields=['last_synced_at']),
+            models.Index(fields=['is_available'], name='doctor_is_available_idx'),
         ]
 
     def __str__(self):
@@ -114,6 +116,8 @@ class Appointment(models.Model):
             models.Index(fields=['patient', 'appointment_date']),
             models.Index(fields=['doctor', 'appointment_date']),
             models.Index(fields=['status']),
+            models.Index(fields=['status', 'appointment_date'], name='appt_status_date_idx'),
+            models.Index(fields=['doctor', 'patient'], name='appt_doctor_patient_idx'),
         ]
     
     def __str__(self):
@@ -142,38 +146,61 @@ class Appointment(models.Model):
         """Check if appointment can be cancelled."""
         return self.status in ['PENDING', 'CONFIRMED']
     
+    def _transition(self, action, from_statuses, now, **fields):
+        """
+        Apply a status transition with one conditional UPDATE.
+        
+        The row only changes if its stored status is still one of
+        from_statuses, so two concurrent transitions cannot both succeed.
+        updated_at is stamped with the caller's now, and the new values
+        are mirrored onto self when the update applied.
+        """
+        fields['updated_at'] = now
+        updated = Appointment.objects.filter(
+            pk=self.pk, status__in=from_statuses
+        ).update(**fields)
+        if not updated:
+            current = Appointment.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+            raise ValidationError(
+                f"Cannot {action} appointment: its status was changed to '{current}' by another request"
+            )
+        for name, value in fields.items():
+            setattr(self, name, value)
+    
     def confirm(self):
         """Confirm the appointment (PENDING → CONFIRMED)."""
         if not self.can_be_confirmed():
             raise ValidationError(f"Cannot confirm appointment with status '{self.status}'")
-        self.status = 'CONFIRMED'
-        self.confirmed_at = timezone.now()
-        self.save()
+        now = timezone.now()
+        self._transition('confirm', ['PENDING'], now, status='CONFIRMED', confirmed_at=now)
     
     def complete(self):
         """Mark appointment as completed (CONFIRMED → COMPLETED)."""
         if not self.can_be_completed():
             raise ValidationError(f"Cannot complete appointment with status '{self.status}'")
-        self.status = 'COMPLETED'
-        self.completed_at = timezone.now()
-        self.save()
+        now = timezone.now()
+        self._transition('complete', ['CONFIRMED'], now, status='COMPLETED', completed_at=now)
     
     def cancel(self, reason='', cancelled_by='ADMIN'):
         """Cancel the appointment with reason tracking."""
         if not self.can_be_cancelled():
             raise ValidationError(f"Cannot cancel appointment with status '{self.status}'")
-        self.status = 'CANCELLED'
-        self.cancelled_reason = reason
-        self.cancelled_by = cancelled_by
-        self.cancelled_at = timezone.now()
-        self.save()
+        now = timezone.now()
+        self._transition(
+            'cancel',
+            ['PENDING', 'CONFIRMED'],
+            now,
+            status='CANCELLED',
+            cancelled_reason=reason,
+            cancelled_by=cancelled_by,
+            cancelled_at=now
+        )
     
     def mark_no_show(self):
         """Mark appointment as no-show (CONFIRMED → NO_SHOW)."""
         if self.status != 'CONFIRMED':
             raise ValidationError(f"Can only mark confirmed appointments as no-show")
-        self.status = 'NO_SHOW'
-        self.save()
+        self._transition('mark no-show on', ['CONFIRMED'], timezone.now(), status='NO_SHOW')
 
 
 class Pharmacy(models.Model):
@@ -445,17 +472,55 @@ class Notification(models.Model):
             models.Index(fields=['user', 'is_read']),
             models.Index(fields=['notification_type']),
             models.Index(fields=['created_at']),
+            # Inbox filtered by read state, newest first
+            models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_read_created_idx'),
+            # Unread badge counts and unread listings only touch unread rows
+            models.Index(
+                fields=['user', '-created_at'],
+                name='notif_user_unread_idx',
+                condition=models.Q(is_read=False)
+            ),
         ]
     
+    # Unread badge counts are polled often; cache them briefly per user
+    UNREAD_COUNT_CACHE_KEY = 'unread_count:{user_id}'
+    UNREAD_COUNT_CACHE_TIMEOUT = 30
+    
     def __str__(self):
         return f"[{self.notification_type}] {self.title} → {self.user.username}"
     
+    def save(self, *args, **kwargs):
+        """Save and drop the owner's cached unread count."""
+        super().save(*args, **kwargs)
+        Notification.invalidate_unread_count(self.user_id)
+    
+    def delete(self, *args, **kwargs):
+        """Delete and drop the owner's cached unread count."""
+        user_id = self.user_id
+        result = super().delete(*args, **kwargs)
+        Notification.invalidate_unread_count(user_id)
+        return result
+    
+    @classmethod
+    def get_unread_count(cls, user_id):
+        """Get a user's unread notification count, cached for a short TTL."""
+        return cache.get_or_set(
+            cls.UNREAD_COUNT_CACHE_KEY.format(user_id=user_id),
+            lambda: cls.objects.filter(user_id=user_id, is_read=False).count(),
+            cls.UNREAD_COUNT_CACHE_TIMEOUT
+        )
+    
+    @classmethod
+    def invalidate_unread_count(cls, user_id):
+        """Drop a user's cached unread count after bulk changes that skip save()."""
+        cache.delete(cls.UNREAD_COUNT_CACHE_KEY.format(user_id=user_id))
+    
     def mark_as_read(self):
         """Mark notification as read."""
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save()
+            self.save(update_fields=['is_read', 'read_at'])
     
     def get_summary(self):
         """Get notification summary for low-bandwidth transmission."""
@@ -6,6 +6,7 @@ Designed for low-bandwidth rural environments with extensible architecture
 for future SMS/Email gateway integration.
 """
 
+from django.db import transaction
 from django.utils import timezone
 from django.contrib.auth.models import User
 from .models import Notification, NotificationPreference
@@ -190,6 +191,46 @@ class NotificationService:
             appointment=appointment
         )
     
+    @staticmethod
+    def notify_appointment_event(appointment, event, **kwargs):
+        """
+        Send the notifications for an appointment lifecycle event.
+        
+        Args:
+            appointment (Appointment): The appointment the event applies to
+            event (str): Key of APPOINTMENT_EVENT_HANDLERS
+            **kwargs: Extra arguments for the handler (e.g. reason)
+        """
+        APPOINTMENT_EVENT_HANDLERS[event](appointment, **kwargs)
+    
+    @staticmethod
+    def dispatch_appointment_event(appointment, event, **kwargs):
+        """
+        Schedule an appointment event notification for after the current commit.
+        
+        Notifications are never sent for a state change that is rolled back.
+        Outside a transaction the notification is sent immediately.
+        
+        Args:
+            appointment (Appointment): The appointment the event applies to
+            event (str): Key of APPOINTMENT_EVENT_HANDLERS
+            **kwargs: Extra arguments for the handler (e.g. reason)
+        """
+        transaction.on_commit(
+            lambda: NotificationService.notify_appointment_event(appointment, event, **kwargs)
+        )
+    
+    @staticmethod
+    def _notify_staff(title, message, **kwargs):
+        """Send one notification to each staff user, streaming them in batches."""
+        for admin in User.objects.filter(is_staff=True).iterator(chunk_size=500):
+            NotificationService.create_notification(
+                user=admin,
+                title=title,
+                message=message,
+                **kwargs
+            )
+    
     @staticmethod
     def notify_low_inventory(pharmacy, medicine, quantity, threshold):
         """
@@ -203,18 +244,14 @@ class NotificationService:
         """
         # Find pharmacy admins (users linked to pharmacy)
         # For now, notify system admins
-        admin_users = User.objects.filter(is_staff=True)
-        
-        for admin in admin_users:
-            NotificationService.create_notification(
-                user=admin,
-                title="Low Stock Alert",
-                message=f"Medicine '{medicine.name}' at pharmacy '{pharmacy.name}' ({pharmacy.location}) "
-                        f"has fallen below threshold. Current stock: {quantity} units (Threshold: {threshold} units).",
-                notification_type='PHARMACY',
-                pharmacy=pharmacy,
-                medicine=medicine
-            )
+        NotificationService._notify_staff(
+            title="Low Stock Alert",
+            message=f"Medicine '{medicine.name}' at pharmacy '{pharmacy.name}' ({pharmacy.location}) "
+                    f"has fallen below threshold. Current stock: {quantity} units (Threshold: {threshold} units).",
+            notification_type='PHARMACY',
+            pharmacy=pharmacy,
+            medicine=medicine
+        )
     
     @staticmethod
     def notify_inventory_restocked(pharmacy, medicine, new_quantity):
@@ -227,23 +264,19 @@ class NotificationService:
             new_quantity (int): New quantity
         """
         # Notify admins about restock
-        admin_users = User.objects.filter(is_staff=True)
-        
-        for admin in admin_users:
-            NotificationService.create_notification(
-                user=admin,
-                title="Inventory Restocked",
-                message=f"Medicine '{medicine.name}' at pharmacy '{pharmacy.name}' ({pharmacy.location}) "
-                        f"has been restocked. New quantity: {new_quantity} units.",
-                notification_type='PHARMACY',
-                pharmacy=pharmacy,
-                medicine=medicine
-            )
+        NotificationService._notify_staff(
+            title="Inventory Restocked",
+            message=f"Medicine '{medicine.name}' at pharmacy '{pharmacy.name}' ({pharmacy.location}) "
+                    f"has been restocked. New quantity: {new_quantity} units.",
+            notification_type='PHARMACY',
+            pharmacy=pharmacy,
+            medicine=medicine
+        )
     
     @staticmethod
     def get_user_unread_count(user):
         """Get count of unread notifications for a user."""
-        return Notification.objects.filter(user=user, is_read=False).count()
+        return Notification.get_unread_count(user.id)
     
     @staticmethod
     def get_user_notifications(
@@ -294,3 +327,12 @@ class NotificationService:
             return (prefs.quiet_hours_start <= current_time <= prefs.quiet_hours_end)
         except NotificationPreference.DoesNotExist:
             return False
+
+
+# Appointment lifecycle events dispatched by the appointment views
+APPOINTMENT_EVENT_HANDLERS = {
+    'confirmed': NotificationService.notify_appointment_confirmed,
+    'completed': NotificationService.notify_appointment_completed,
+    'cancelled': NotificationService.notify_appointment_cancelled,
+    'no_show': NotificationService.notify_appointment_no_show,
+}
@@ -0,0 +1,41 @@
+"""
+Pagination classes for the telemedicine API.
+
+Keeps list payloads bounded for low-bandwidth rural clients.
+"""
+
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    """
+    Page-number pagination for larger catalogue-style listings.
+
+    Clients may request a different page size with ?page_size=N,
+    capped at max_page_size.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_page_metadata(self):
+        """Count and links for responses that wrap the page in their own envelope."""
+        return {
+            'count': self.page.paginator.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+
+
+class NotificationCursorPagination(CursorPagination):
+    """
+    Cursor pagination for notification inboxes, newest first.
+
+    Pages are anchored to a position rather than an offset, so notifications
+    that arrive or are marked read while a client pages through the inbox
+    do not shift or repeat entries.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
@@ -205,6 +205,9 @@ class PharmacySerializer(serializers.ModelSerializer):
     
     def get_available_medicines_count(self, obj):
         """Count of medicines available in this pharmacy."""
+        # Use the count annotated by PharmacyViewSet when present
+        if hasattr(obj, 'available_medicines_count'):
+            return obj.available_medicines_count
         return obj.get_available_medicines().count()
 
 
@@ -276,6 +279,9 @@ class MedicineAvailabilitySerializer(serializers.Serializer):
     
     def get_total_available_at(self, obj):
         """Get total number of pharmacies with this medicine in stock."""
+        # Paginated callers pass the total, since inventory_items is one page
+        if 'total_available_at' in obj:
+            return obj['total_available_at']
         return len(obj['inventory_items'])
 
 
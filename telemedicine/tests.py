@@ -1,3 +1,169 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.test import TestCase
+from django.utils import timezone
+
+from telemedicine.models import Patient, Doctor, Appointment, Notification
+from telemedicine.notification_service import NotificationService
+
+
+class AppointmentTestCase(TestCase):
+    """Shared patient/doctor fixtures for appointment tests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        patient_user = User.objects.create_user(username='transition_patient', password='TestPass@123')
+        doctor_user = User.objects.create_user(username='transition_doctor', password='TestPass@123')
+        cls.patient = Patient.objects.create(
+            user=patient_user,
+            date_of_birth='1995-01-15',
+            gender='Male',
+            phone_number='+919876543250',
+            address='Address'
+        )
+        cls.doctor = Doctor.objects.create(
+            user=doctor_user,
+            specialization='General Medicine',
+            license_number='TRANSITION-DOC-001',
+            phone_number='+919876543251',
+            experience_years=5
+        )
+
+    def _appointment(self, status='PENDING'):
+        appointment = Appointment.objects.create(
+            patient=self.patient,
+            doctor=self.doctor,
+            appointment_date=timezone.now() + timedelta(days=3),
+        )
+        if status != 'PENDING':
+            Appointment.objects.filter(pk=appointment.pk).update(status=status)
+            appointment.status = status
+        return appointment
+
+
+class AppointmentTransitionTests(AppointmentTestCase):
+    """Status transitions apply only against the stored status"""
+
+    def test_confirm_writes_status_and_timestamps(self):
+        """A successful transition is stored and mirrored onto the instance"""
+        appointment = self._appointment()
+        appointment.confirm()
+
+        stored = Appointment.objects.get(pk=appointment.pk)
+        self.assertEqual(stored.status, 'CONFIRMED')
+        self.assertIsNotNone(stored.confirmed_at)
+        self.assertEqual(stored.confirmed_at, stored.updated_at)
+        self.assertEqual(appointment.status, 'CONFIRMED')
+        self.assertEqual(appointment.confirmed_at, stored.confirmed_at)
+        self.assertEqual(appointment.updated_at, stored.updated_at)
+
+    def test_cancel_writes_reason_and_timestamps(self):
+        """Cancelling stores the reason, actor and a single timestamp"""
+        appointment = self._appointment('CONFIRMED')
+        appointment.cancel(reason='Patient travelling', cancelled_by='PATIENT')
+
+        stored = Appointment.objects.get(pk=appointment.pk)
+        self.assertEqual(stored.status, 'CANCELLED')
+        self.assertEqual(stored.cancelled_reason, 'Patient travelling')
+        self.assertEqual(stored.cancelled_by, 'PATIENT')
+        self.assertEqual(stored.cancelled_at, stored.updated_at)
+        self.assertEqual(appointment.cancelled_at, stored.cancelled_at)
+
+    def test_confirm_rejected_after_concurrent_cancel(self):
+        """Confirm fails if another request cancelled the row after it was loaded"""
+        appointment = self._appointment()
+        Appointment.objects.filter(pk=appointment.pk).update(status='CANCELLED')
+        before = Appointment.objects.get(pk=appointment.pk)
+
+        with self.assertRaisesMessage(ValidationError, "changed to 'CANCELLED'"):
+            appointment.confirm()
+
+        after = Appointment.objects.get(pk=appointment.pk)
+        self.assertEqual(after.status, 'CANCELLED')
+        self.assertIsNone(after.confirmed_at)
+        self.assertEqual(after.updated_at, before.updated_at)
+        self.assertEqual(appointment.status, 'PENDING')
+
+    def test_complete_rejected_after_concurrent_no_show(self):
+        """Complete fails if the row was marked no-show after it was loaded"""
+        appointment = self._appointment('CONFIRMED')
+        Appointment.objects.filter(pk=appointment.pk).update(status='NO_SHOW')
+
+        with self.assertRaisesMessage(ValidationError, "changed to 'NO_SHOW'"):
+            appointment.complete()
+
+        after = Appointment.objects.get(pk=appointment.pk)
+        self.assertEqual(after.status, 'NO_SHOW')
+        self.assertIsNone(after.completed_at)
+
+    def test_cancel_rejected_after_concurrent_complete(self):
+        """Cancel fails if the row was completed after it was loaded"""
+        appointment = self._appointment('CONFIRMED')
+        Appointment.objects.filter(pk=appointment.pk).update(status='COMPLETED')
+
+        with self.assertRaisesMessage(ValidationError, "changed to 'COMPLETED'"):
+            appointment.cancel(reason='Too late')
+
+        after = Appointment.objects.get(pk=appointment.pk)
+        self.assertEqual(after.status, 'COMPLETED')
+        self.assertEqual(after.cancelled_reason, '')
+        self.assertIsNone(after.cancelled_at)
+
+    def test_mark_no_show_rejected_after_concurrent_cancel(self):
+        """No-show fails if the row was cancelled after it was loaded"""
+        appointment = self._appointment('CONFIRMED')
+        Appointment.objects.filter(pk=appointment.pk).update(status='CANCELLED')
+
+        with self.assertRaisesMessage(ValidationError, "changed to 'CANCELLED'"):
+            appointment.mark_no_show()
+
+        self.assertEqual(Appointment.objects.get(pk=appointment.pk).status, 'CANCELLED')
+
+    def test_invalid_in_memory_status_rejected_without_query(self):
+        """A transition invalid for the loaded status fails before touching the database"""
+        appointment = self._appointment('COMPLETED')
+        with self.assertNumQueries(0):
+            with self.assertRaisesMessage(ValidationError, "with status 'COMPLETED'"):
+                appointment.confirm()
+
+
+class AppointmentEventDispatchTests(AppointmentTestCase):
+    """Appointment notifications are sent only once the change commits"""
+
+    def _patient_notifications(self):
+        return Notification.objects.filter(user=self.patient.user)
+
+    def test_notification_deferred_until_commit(self):
+        """dispatch_appointment_event queues the notifier on commit"""
+        appointment = self._appointment('CONFIRMED')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            NotificationService.dispatch_appointment_event(appointment, 'completed')
+            self.assertFalse(self._patient_notifications().exists())
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self._patient_notifications().count(), 1)
+
+    def test_notification_skipped_on_rollback(self):
+        """No notification is queued for a change that is rolled back"""
+        appointment = self._appointment()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    appointment.confirm()
+                    NotificationService.dispatch_appointment_event(appointment, 'confirmed')
+                    raise RuntimeError('abort')
+            except RuntimeError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(self._patient_notifications().exists())
+        self.assertEqual(Appointment.objects.get(pk=appointment.pk).status, 'PENDING')
 
-# Create your tests here.
+    def test_unknown_event_rejected(self):
+        """Events outside APPOINTMENT_EVENT_HANDLERS fail loudly"""
+        appointment = self._appointment()
+        with self.assertRaises(KeyError):
+            NotificationService.notify_appointment_event(appointment, 'created')
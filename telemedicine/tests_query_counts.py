@@ -0,0 +1,206 @@
+"""
+Query Count Tests - N+1 Regression Guards
+Listing endpoints must issue the same number of queries regardless of row count
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth.models import User
+from telemedicine.models import Notification, Medicine, Pharmacy, PharmacyInventory
+from rest_framework.test import APIClient
+from rest_framework import status
+
+
+class QueryCountTestCase(TestCase):
+    """Authenticated API client plus query-count assertions"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='query_count_user',
+            password='TestPass@123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def assertConstantQueries(self, url, grow, expected):
+        """
+        GET url, call grow() to add rows, GET it again; both requests must
+        issue exactly `expected` queries.
+        """
+        for grow_after in (grow, None):
+            with self.assertNumQueries(expected):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            if grow_after:
+                grow_after()
+
+    def _create_pharmacy(self):
+        return Pharmacy.objects.create(
+            name='Village Chemist',
+            location='Nabha',
+            contact_number='+919876543210',
+            address='Main Road'
+        )
+
+
+class NotificationQueryCountTests(QueryCountTestCase):
+    """Notification list query count does not grow with the inbox"""
+
+    def setUp(self):
+        super().setUp()
+        self.medicine = Medicine.objects.create(name='Paracetamol')
+        self.pharmacy = self._create_pharmacy()
+
+    def _create_notifications(self, count):
+        for i in range(count):
+            Notification.objects.create(
+                user=self.user,
+                title=f'Notification {i}',
+                message='Medicine back in stock',
+                notification_type='MEDICINE',
+                medicine=self.medicine,
+                pharmacy=self.pharmacy
+            )
+
+    def test_mark_read_is_one_select_and_one_update(self):
+        """Toggling read state loads the row once and writes two columns"""
+        self._create_notifications(1)
+        notification = Notification.objects.get(user=self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(
+                f'/api/notifications/{notification.id}/mark_read/',
+                {'is_read': True},
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statements = [q['sql'].split()[0].upper() for q in context.captured_queries]
+        self.assertEqual(statements, ['SELECT', 'UPDATE'])
+
+    def test_notification_list_query_count_is_constant(self):
+        """Related names are joined, not fetched per notification"""
+        self._create_notifications(1)
+        # Cursor pagination: a single joined SELECT, no COUNT
+        self.assertConstantQueries(
+            '/api/notifications/', lambda: self._create_notifications(5), expected=1
+        )
+
+
+class UnreadCountCacheTests(QueryCountTestCase):
+    """Unread badge polls are served from cache until the inbox changes"""
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+
+    def _create_notification(self):
+        return Notification.objects.create(
+            user=self.user,
+            title='Appointment Confirmed',
+            message='Your appointment has been confirmed.'
+        )
+
+    def test_repeat_poll_skips_count_query(self):
+        """A second poll is served without touching the database"""
+        self._create_notification()
+        self.client.get('/api/notifications/unread_count/')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/notifications/unread_count/')
+        self.assertEqual(response.data['unread_count'], 1)
+
+    def test_inbox_changes_invalidate_cached_count(self):
+        """New and bulk-read notifications are reflected immediately"""
+        self._create_notification()
+        response = self.client.get('/api/notifications/unread_count/')
+        self.assertEqual(response.data['unread_count'], 1)
+
+        self._create_notification()
+        response = self.client.get('/api/notifications/unread_count/')
+        self.assertEqual(response.data['unread_count'], 2)
+
+        self.client.post('/api/notifications/mark_all_as_read/')
+        response = self.client.get('/api/notifications/unread_count/')
+        self.assertEqual(response.data['unread_count'], 0)
+
+
+class InventoryQueryCountTests(QueryCountTestCase):
+    """Pharmacy stock listing query count does not grow with the stock list"""
+
+    def setUp(self):
+        super().setUp()
+        self.pharmacy = self._create_pharmacy()
+        self.stocked = 0
+
+    def _stock_medicines(self, count):
+        for i in range(self.stocked, self.stocked + count):
+            PharmacyInventory.objects.create(
+                pharmacy=self.pharmacy,
+                medicine=Medicine.objects.create(name=f'Medicine {i}'),
+                quantity_available=10
+            )
+        self.stocked += count
+
+    def test_by_pharmacy_query_count_is_constant(self):
+        """Medicines are joined, not fetched per inventory row"""
+        self._stock_medicines(1)
+        # Pharmacy lookup, paginator COUNT, joined page SELECT
+        self.assertConstantQueries(
+            f'/api/pharmacy-inventory/by_pharmacy/?pharmacy_id={self.pharmacy.id}',
+            lambda: self._stock_medicines(5),
+            expected=3
+        )
+
+    def test_pharmacy_list_counts_in_stock_medicines_in_one_query(self):
+        """The in-stock count is aggregated with the pharmacies, no rows fetched"""
+        self._stock_medicines(2)
+        PharmacyInventory.objects.create(
+            pharmacy=self.pharmacy,
+            medicine=Medicine.objects.create(name='Out of stock'),
+            quantity_available=0
+        )
+
+        # One COUNT for the paginator, one SELECT with the aggregate
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/pharmacies/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['available_medicines_count'], 2)
+
+
+class InventoryFastPathTests(QueryCountTestCase):
+    """?fast=1 rows match the serializer output key for key"""
+
+    def setUp(self):
+        super().setUp()
+        self.pharmacy = self._create_pharmacy()
+        self.medicine = Medicine.objects.create(name='Amoxicillin', is_prescription_required=True)
+        PharmacyInventory.objects.create(
+            pharmacy=self.pharmacy, medicine=self.medicine, quantity_available=12
+        )
+        PharmacyInventory.objects.create(
+            pharmacy=self.pharmacy,
+            medicine=Medicine.objects.create(name='Paracetamol'),
+            quantity_available=30
+        )
+
+    def assertFastPathMatches(self, url):
+        """The rendered ?fast=1 response equals the default response"""
+        default = self.client.get(url)
+        fast = self.client.get(f'{url}&fast=1')
+        self.assertEqual(default.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.json(), default.json())
+
+    def test_by_medicine_fast_path_matches_serializer(self):
+        """The .values() aliases track MedicineAvailabilitySerializer"""
+        self.assertFastPathMatches(
+            f'/api/pharmacy-inventory/by_medicine/?medicine_id={self.medicine.id}'
+        )
+
+    def test_by_pharmacy_fast_path_matches_serializer(self):
+        """The .values() aliases track PharmacyInventorySerializer"""
+        self.assertFastPathMatches(
+            f'/api/pharmacy-inventory/by_pharmacy/?pharmacy_id={self.pharmacy.id}'
+        )
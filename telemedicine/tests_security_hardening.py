@@ -3,6 +3,7 @@ Security Hardening Tests - Permission Edge Cases
 Tests data isolation, write restrictions, and error handling
 """
 
+from unittest import mock
 from django.test import TestCase
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -10,23 +11,27 @@ from datetime import timedelta
 from telemedicine.models import Patient, Doctor, Appointment
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from telemedicine.authentication import ProfileJWTAuthentication
 
 
 class SecurityHardeningTests(TestCase):
     """Comprehensive security tests for permission enforcement"""
 
-    def setUp(self):
-        """Create test users and data"""
-        self.client = APIClient()
+    @classmethod
+    def setUpTestData(cls):
+        """Create test users and data once for the whole class"""
 
         # Patient 1
-        self.patient1_user = User.objects.create_user(
+        cls.patient1_user = User.objects.create_user(
             username='security_test_patient_1',
             email='patient1@test.gov',
             password='TestPass@123'
         )
-        self.patient1 = Patient.objects.create(
-            user=self.patient1_user,
+        cls.patient1 = Patient.objects.create(
+            user=cls.patient1_user,
             date_of_birth='1995-01-15',
             gender='Male',
             phone_number='+919876543210',
@@ -34,13 +39,13 @@ class SecurityHardeningTests(TestCase):
         )
 
         # Patient 2
-        self.patient2_user = User.objects.create_user(
+        cls.patient2_user = User.objects.create_user(
             username='security_test_patient_2',
             email='patient2@test.gov',
             password='TestPass@123'
         )
-        self.patient2 = Patient.objects.create(
-            user=self.patient2_user,
+        cls.patient2 = Patient.objects.create(
+            user=cls.patient2_user,
             date_of_birth='1996-02-20',
             gender='Female',
             phone_number='+919876543211',
@@ -48,13 +53,13 @@ class SecurityHardeningTests(TestCase):
         )
 
         # Doctor 1
-        self.doctor1_user = User.objects.create_user(
+        cls.doctor1_user = User.objects.create_user(
             username='security_test_doctor_1',
             email='doctor1@test.gov',
             password='TestPass@123'
         )
-        self.doctor1 = Doctor.objects.create(
-            user=self.doctor1_user,
+        cls.doctor1 = Doctor.objects.create(
+            user=cls.doctor1_user,
             specialization='General Medicine',
             license_number='SEC-TEST-DOC-001',
             phone_number='+919876543220',
@@ -62,13 +67,13 @@ class SecurityHardeningTests(TestCase):
         )
 
         # Doctor 2
-        self.doctor2_user = User.objects.create_user(
+        cls.doctor2_user = User.objects.create_user(
             username='security_test_doctor_2',
             email='doctor2@test.gov',
             password='TestPass@123'
         )
-        self.doctor2 = Doctor.objects.create(
-            user=self.doctor2_user,
+        cls.doctor2 = Doctor.objects.create(
+            user=cls.doctor2_user,
             specialization='Cardiology',
             license_number='SEC-TEST-DOC-002',
             phone_number='+919876543221',
@@ -76,31 +81,36 @@ class SecurityHardeningTests(TestCase):
         )
 
         # Appointment between Patient 1 and Doctor 1
-        self.appointment = Appointment.objects.create(
-            patient=self.patient1,
-            doctor=self.doctor1,
+        cls.appointment = Appointment.objects.create(
+            patient=cls.patient1,
+            doctor=cls.doctor1,
             appointment_date=timezone.now() + timedelta(days=5),
-            status='Scheduled',
+            status='PENDING',
             symptoms='Test symptoms'
         )
 
-        # Completed appointment
-        self.completed_appointment = Appointment.objects.create(
-            patient=self.patient1,
-            doctor=self.doctor1,
-            appointment_date=timezone.now() - timedelta(days=1),
-            status='Completed',
-            diagnosis='Test diagnosis'
-        )
+        # Completed appointment; bulk_create skips save(), whose clean() rejects past dates
+        cls.completed_appointment, = Appointment.objects.bulk_create([
+            Appointment(
+                patient=cls.patient1,
+                doctor=cls.doctor1,
+                appointment_date=timezone.now() - timedelta(days=1),
+                status='COMPLETED',
+                diagnosis='Test diagnosis'
+            )
+        ])
 
         # Appointment between Patient 2 and Doctor 2 (unrelated)
-        self.appointment2 = Appointment.objects.create(
-            patient=self.patient2,
-            doctor=self.doctor2,
+        cls.appointment2 = Appointment.objects.create(
+            patient=cls.patient2,
+            doctor=cls.doctor2,
             appointment_date=timezone.now() + timedelta(days=6),
-            status='Scheduled'
+            status='PENDING'
         )
 
+    def setUp(self):
+        self.client = APIClient()
+
     def test_patient_cannot_access_other_patient_record(self):
         """Patient cannot access another patient's record (403 or 404)"""
         self.client.force_authenticate(user=self.patient1_user)
@@ -207,3 +217,76 @@ class SecurityHardeningTests(TestCase):
         self.assertTrue('detail' in response.data)
         error_message = str(response.data.get('detail', '')).lower()
         self.assertTrue('yourself' in error_message or 'other' in error_message or 'permission' in error_message)
+
+
+class LogoutRevocationTests(TestCase):
+    """Tokens presented at logout are revoked immediately"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='logout_test_user',
+            password='TestPass@123'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_access_token_rejected_after_logout(self):
+        """The access token used to log out cannot be reused"""
+        refresh = RefreshToken.for_user(self.user)
+        access = str(refresh.access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post('/api/auth/logout/', {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ProfileJWTAuthenticationTests(TestCase):
+    """Profile join on token auth keeps simplejwt's user checks"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='jwt_profile_test_user',
+            password='TestPass@123'
+        )
+        cls.patient = Patient.objects.create(
+            user=cls.user,
+            date_of_birth='1995-01-15',
+            gender='Male',
+            phone_number='+919876543240',
+            address='Address'
+        )
+
+    def test_profile_loaded_with_user(self):
+        """The patient profile comes back in the same query as the user"""
+        token = AccessToken.for_user(self.user)
+        with self.assertNumQueries(1):
+            user = ProfileJWTAuthentication().get_user(token)
+            self.assertEqual(user.patient.id, self.patient.id)
+
+    def test_inactive_user_rejected(self):
+        """Inactive users are still rejected"""
+        token = AccessToken.for_user(self.user)
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            ProfileJWTAuthentication().get_user(token)
+
+    def test_revoke_token_check_respected(self):
+        """CHECK_REVOKE_TOKEN rejects tokens issued before a password change"""
+        if 'CHECK_REVOKE_TOKEN' not in api_settings.defaults:
+            self.skipTest('simplejwt version has no CHECK_REVOKE_TOKEN')
+        # simplejwt modules hold a reference to api_settings, so patch it in place
+        with mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True):
+            token = AccessToken.for_user(self.user)
+            self.user.set_password('NewPass@123')
+            self.user.save()
+            with self.assertRaises(AuthenticationFailed):
+                ProfileJWTAuthentication().get_user(token)
@@ -1,12 +1,22 @@
+from datetime import datetime
+from functools import lru_cache
+
 from rest_framework import viewsets, status
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import (
+    action, api_view, authentication_classes, permission_classes,
+    renderer_classes, parser_classes
+)
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.utils import timezone
+from django.db import IntegrityError, transaction
+from django.db.models import Q, F, Count, Exists, OuterRef, Value, BooleanField
 
 from .models import Patient, Doctor, Appointment, Pharmacy, Medicine, PharmacyInventory, Notification, NotificationPreference
 from .serializers import (
@@ -25,10 +35,37 @@ from .auth_serializers import (
     UserSerializer, LogoutSerializer
 )
 from .error_messages import ErrorMessages
+from .appointment_service import AppointmentService
+from .authentication import cache_blacklisted_token
+from .pagination import StandardResultsSetPagination, NotificationCursorPagination
 from .ai.rule_engine import evaluate_symptoms
 from .notification_service import NotificationService
 
 
+@lru_cache(maxsize=1)
+def _notification_service():
+    """Shared NotificationService instance, reused across requests."""
+    return NotificationService()
+
+
+def _resolve_user_profile(user):
+    """
+    Return (user_type, profile_id) for a user.
+    
+    Expects the user to have been loaded with select_related('patient', 'doctor')
+    (as LoginSerializer and ProfileJWTAuthentication do), so no query is issued.
+    """
+    patient = getattr(user, 'patient', None)
+    if patient is not None:
+        return 'patient', patient.id
+    
+    doctor = getattr(user, 'doctor', None)
+    if doctor is not None:
+        return 'doctor', doctor.id
+    
+    return ('admin' if user.is_staff else 'user'), None
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Custom token endpoint with enhanced user information.
@@ -51,15 +88,7 @@ class LoginView(viewsets.ViewSet):
             refresh = RefreshToken.for_user(user)
             
             # Get user type
-            user_type = 'admin' if user.is_staff else 'user'
-            profile_id = None
-            
-            if hasattr(user, 'patient'):
-                user_type = 'patient'
-                profile_id = user.patient.id
-            elif hasattr(user, 'doctor'):
-                user_type = 'doctor'
-                profile_id = user.doctor.id
+            user_type, profile_id = _resolve_user_profile(user)
             
             return Response({
                 'access': str(refresh.access_token),
@@ -85,6 +114,10 @@ class LoginView(viewsets.ViewSet):
                 refresh_token = serializer.validated_data['refresh']
                 token = RefreshToken(refresh_token)
                 token.blacklist()
+                # The token_blacklist app revokes the refresh token; the access
+                # token presented with this request is revoked via the cache
+                if request.auth is not None:
+                    cache_blacklisted_token(request.auth)
                 return Response(
                     {'detail': 'Successfully logged out'},
                     status=status.HTTP_200_OK
@@ -101,16 +134,7 @@ class LoginView(viewsets.ViewSet):
     def me(self, request):
         """Get current user information"""
         user = request.user
-        
-        user_type = 'admin' if user.is_staff else 'user'
-        profile_id = None
-        
-        if hasattr(user, 'patient'):
-            user_type = 'patient'
-            profile_id = user.patient.id
-        elif hasattr(user, 'doctor'):
-            user_type = 'doctor'
-            profile_id = user.doctor.id
+        user_type, profile_id = _resolve_user_profile(user)
         
         return Response({
             'user_id': user.id,
@@ -124,7 +148,52 @@ class LoginView(viewsets.ViewSet):
         })
 
 
-class PatientViewSet(viewsets.ModelViewSet):
+class CachedQuerysetMixin:
+    """
+    Memoize the role-filtered queryset for the lifetime of the view.
+    
+    DRF builds one view instance per request, so the cache is request-scoped.
+    Subclasses implement build_queryset() instead of get_queryset().
+    
+    Columns named in list_deferred_fields are left out of list queries;
+    detail and write actions still load full rows.
+    """
+    list_deferred_fields = ()
+    
+    def get_queryset(self):
+        queryset = getattr(self, '_qs_cache', None)
+        if queryset is None:
+            queryset = self._qs_cache = self.build_queryset()
+            if self.action == 'list' and self.list_deferred_fields:
+                queryset = self._qs_cache = queryset.defer(*self.list_deferred_fields)
+        # Hand out a clone so callers never share a result cache
+        return queryset.all()
+
+
+class OwnProfileCreateMixin:
+    """
+    Create a patient/doctor profile for the requesting user only.
+    
+    'user' is not a serializer field, so the raw value is compared as text
+    (a malformed id is a permission error, not a ValueError). The one-to-one
+    constraint turns a second profile for the same user into a 400.
+    """
+    create_other_message = None
+    duplicate_message = None
+    
+    def perform_create(self, serializer):
+        user_id = serializer.initial_data.get('user')
+        if user_id not in (None, '') and str(user_id) != str(self.request.user.id):
+            raise PermissionDenied(detail=self.create_other_message)
+        
+        try:
+            with transaction.atomic():
+                serializer.save(user=self.request.user)
+        except IntegrityError:
+            raise ValidationError(detail=self.duplicate_message)
+
+
+class PatientViewSet(OwnProfileCreateMixin, CachedQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Patient management with strict authentication and permissions.
     - Patients can only access their own records
@@ -132,11 +201,15 @@ class PatientViewSet(viewsets.ModelViewSet):
     - Admin has full access
     - Write operations strictly restricted
     """
-    queryset = Patient.objects.all()
+    queryset = Patient.objects.none()
     serializer_class = PatientSerializer
+    # Sync bookkeeping columns are never rendered in listings
+    list_deferred_fields = ('created_at', 'updated_at', 'last_synced_at')
+    create_other_message = ErrorMessages.PATIENT_CREATE_OTHER
+    duplicate_message = ErrorMessages.PATIENT_DUPLICATE
     permission_classes = [IsAuthenticated, IsOwnPatientRecord, CannotCreatePatientForOthers]
     
-    def get_queryset(self):
+    def build_queryset(self):
         """Filter queryset based on user type - STRICT enforcement"""
         user = self.request.user
         
@@ -145,43 +218,25 @@ class PatientViewSet(viewsets.ModelViewSet):
         
         # Admin can see all
         if user.is_staff:
-            return Patient.objects.all()
+            return Patient.objects.all().select_related('user')
         
         # Patients can only see their own record
         if hasattr(user, 'patient'):
             patient = getattr(user, 'patient', None)
             if patient:
-                return Patient.objects.filter(user=user)
+                return Patient.objects.filter(user=user).select_related('user')
         
         # Doctors can see patients only for their appointments
         if hasattr(user, 'doctor'):
             doctor = getattr(user, 'doctor', None)
             if doctor:
-                patient_ids = Appointment.objects.filter(
-                    doctor=doctor
-                ).values_list('patient_id', flat=True).distinct()
-                return Patient.objects.filter(id__in=patient_ids)
+                return Patient.objects.filter(Exists(
+                    Appointment.objects.filter(doctor_id=doctor.id, patient_id=OuterRef('pk'))
+                )).select_related('user')
         
         # Unauthorized user type
         return Patient.objects.none()
     
-    def perform_create(self, serializer):
-        """Strict validation for patient creation"""
-        # User must match the patient being created
-        user_id = serializer.initial_data.get('user')
-        if user_id and int(user_id) != self.request.user.id:
-            raise PermissionDenied(
-                detail=ErrorMessages.PATIENT_CREATE_OTHER
-            )
-        
-        # Check if patient already exists for this user
-        if Patient.objects.filter(user=self.request.user).exists():
-            raise ValidationError(
-                detail=ErrorMessages.PATIENT_DUPLICATE
-            )
-        
-        serializer.save()
-    
     def perform_update(self, serializer):
         """Strict validation for patient updates"""
         # Patients can only update their own record
@@ -202,7 +257,7 @@ class PatientViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
-class DoctorViewSet(viewsets.ModelViewSet):
+class DoctorViewSet(OwnProfileCreateMixin, CachedQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Doctor management with strict authentication and permissions.
     - Doctors can only access their own records
@@ -210,11 +265,15 @@ class DoctorViewSet(viewsets.ModelViewSet):
     - Admin has full access
     - Write operations strictly restricted
     """
-    queryset = Doctor.objects.all()
+    queryset = Doctor.objects.none()
     serializer_class = DoctorSerializer
+    # Sync bookkeeping columns are never rendered in listings
+    list_deferred_fields = ('created_at', 'updated_at', 'last_synced_at')
+    create_other_message = ErrorMessages.DOCTOR_CREATE_OTHER
+    duplicate_message = ErrorMessages.DOCTOR_DUPLICATE
     permission_classes = [IsAuthenticated, IsOwnDoctorRecord, CannotCreateDoctorForOthers]
     
-    def get_queryset(self):
+    def build_queryset(self):
         """Filter queryset based on user type - STRICT enforcement"""
         user = self.request.user
         
@@ -223,22 +282,21 @@ class DoctorViewSet(viewsets.ModelViewSet):
         
         # Admin can see all
         if user.is_staff:
-            return Doctor.objects.all()
+            return Doctor.objects.all().select_related('user')
         
         # Doctors can only see their own record
         if hasattr(user, 'doctor'):
             doctor = getattr(user, 'doctor', None)
             if doctor:
-                return Doctor.objects.filter(user=user)
+                return Doctor.objects.filter(user=user).select_related('user')
         
         # Patients can see doctors they have appointments with
         if hasattr(user, 'patient'):
             patient = getattr(user, 'patient', None)
             if patient:
-                doctor_ids = Appointment.objects.filter(
-                    patient=patient
-                ).values_list('doctor_id', flat=True).distinct()
-                return Doctor.objects.filter(id__in=doctor_ids)
+                return Doctor.objects.filter(Exists(
+                    Appointment.objects.filter(patient_id=patient.id, doctor_id=OuterRef('pk'))
+                )).select_related('user')
         
         # Unauthorized user type
         return Doctor.objects.none()
@@ -252,27 +310,15 @@ class DoctorViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        doctors = Doctor.objects.filter(is_available=True)
+        # Fetch only the columns DoctorSerializer renders, user joined in
+        doctors = Doctor.objects.filter(is_available=True).select_related('user').only(
+            'id', 'user_id', 'specialization', 'license_number', 'phone_number',
+            'experience_years', 'is_available',
+            'user__username', 'user__email', 'user__first_name', 'user__last_name'
+        )
         serializer = self.get_serializer(doctors, many=True)
         return Response(serializer.data)
     
-    def perform_create(self, serializer):
-        """Strict validation for doctor creation"""
-        # User must match the doctor being created
-        user_id = serializer.initial_data.get('user')
-        if user_id and int(user_id) != self.request.user.id:
-            raise PermissionDenied(
-                detail=ErrorMessages.DOCTOR_CREATE_OTHER
-            )
-        
-        # Check if doctor already exists for this user
-        if Doctor.objects.filter(user=self.request.user).exists():
-            raise ValidationError(
-                detail=ErrorMessages.DOCTOR_DUPLICATE
-            )
-        
-        serializer.save()
-    
     def perform_update(self, serializer):
         """Strict validation for doctor updates"""
         # Doctors can only update their own record
@@ -293,7 +339,7 @@ class DoctorViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+class AppointmentViewSet(CachedQuerysetMixin, viewsets.ModelViewSet):
     """
     Enhanced ViewSet for Appointment management with production-ready lifecycle.
     
@@ -307,11 +353,11 @@ class AppointmentViewSet(viewsets.ModelViewSet):
     - Comprehensive audit trail
     - State transition validation
     """
-    queryset = Appointment.objects.all()
+    queryset = Appointment.objects.none()
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated, IsAppointmentParticipant]
     
-    def get_queryset(self):
+    def build_queryset(self):
         """Filter appointments based on user type - STRICT enforcement"""
         user = self.request.user
         
@@ -320,19 +366,25 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         
         # Admin can see all
         if user.is_staff:
-            return Appointment.objects.all().order_by('-appointment_date')
+            return Appointment.objects.all().select_related(
+                'patient__user', 'doctor__user'
+            ).order_by('-appointment_date')
         
         # Patients can only see their own appointments
         if hasattr(user, 'patient'):
             patient = getattr(user, 'patient', None)
             if patient:
-                return Appointment.objects.filter(patient__user=user).order_by('-appointment_date')
+                return Appointment.objects.filter(patient__user=user).select_related(
+                    'patient__user', 'doctor__user'
+                ).order_by('-appointment_date')
         
         # Doctors can only see their assigned appointments
         if hasattr(user, 'doctor'):
             doctor = getattr(user, 'doctor', None)
             if doctor:
-                return Appointment.objects.filter(doctor__user=user).order_by('-appointment_date')
+                return Appointment.objects.filter(doctor__user=user).select_related(
+                    'patient__user', 'doctor__user'
+                ).order_by('-appointment_date')
         
         # Unauthorized user type
         return Appointment.objects.none()
@@ -363,9 +415,16 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         
         # Filter for upcoming appointments if requested
         if request.query_params.get('upcoming') == 'true':
-            from django.utils import timezone
+            # Only active appointments are upcoming unless a status was requested
+            if not status_filter:
+                appointments = appointments.filter(status__in=['PENDING', 'CONFIRMED'])
             appointments = appointments.filter(appointment_date__gte=timezone.now())
-        
+
+        page = self.paginate_queryset(appointments)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
         serializer = self.get_serializer(appointments, many=True)
         return Response(serializer.data)
     
@@ -389,9 +448,8 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         try:
             appointment.confirm()
             
-            # Send notifications to patient and doctor
-            notification_service = NotificationService()
-            notification_service.notify_appointment_confirmed(appointment)
+            # Notify patient and doctor once the transition is committed
+            _notification_service().dispatch_appointment_event(appointment, 'confirmed')
             
             serializer = self.get_serializer(appointment)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -421,9 +479,8 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         try:
             appointment.complete()
             
-            # Send notifications to patient and doctor
-            notification_service = NotificationService()
-            notification_service.notify_appointment_completed(appointment)
+            # Notify patient and doctor once the transition is committed
+            _notification_service().dispatch_appointment_event(appointment, 'completed')
             
             serializer = self.get_serializer(appointment)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -474,9 +531,8 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         try:
             appointment.cancel(reason=reason, cancelled_by=cancelled_by)
             
-            # Send notifications to patient and doctor
-            notification_service = NotificationService()
-            notification_service.notify_appointment_cancelled(appointment, reason)
+            # Notify patient and doctor once the transition is committed
+            _notification_service().dispatch_appointment_event(appointment, 'cancelled', reason=reason)
             
             serializer = self.get_serializer(appointment)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -502,9 +558,8 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         try:
             appointment.mark_no_show()
             
-            # Send notifications to patient and doctor
-            notification_service = NotificationService()
-            notification_service.notify_appointment_no_show(appointment)
+            # Notify patient and doctor once the transition is committed
+            _notification_service().dispatch_appointment_event(appointment, 'no_show')
             
             serializer = self.get_serializer(appointment)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -526,8 +581,6 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         
         Example: GET /appointments/available_slots/?doctor_id=1&date=2026-01-25&num_slots=8
         """
-        from .appointment_service import AppointmentService
-        
         doctor_id = request.query_params.get('doctor_id')
         date_str = request.query_params.get('date')
         num_slots = request.query_params.get('num_slots', 8)
@@ -539,8 +592,10 @@ class AppointmentViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            doctor = Doctor.objects.get(id=doctor_id)
-            from datetime import datetime
+            # Only the columns the slot lookup and response need, user joined
+            doctor = Doctor.objects.select_related('user').only(
+                'id', 'is_available', 'user__first_name', 'user__last_name'
+            ).get(id=doctor_id)
             date = datetime.strptime(date_str, '%Y-%m-%d').date()
             
             slots = AppointmentService.get_available_slots(doctor, date, int(num_slots))
@@ -565,36 +620,21 @@ class AppointmentViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Enhanced validation for appointment creation"""
-        from .appointment_service import AppointmentService, AppointmentValidationError
-        
-        patient_id = serializer.initial_data.get('patient')
-        doctor_id = serializer.initial_data.get('doctor')
+        # Patient and doctor were already resolved (and 404-checked) by the
+        # serializer's primary key fields during validation
+        patient = serializer.validated_data.get('patient')
         
         # Permission check: Patient can only create appointment for themselves
-        if patient_id:
-            try:
-                patient = Patient.objects.get(id=patient_id)
-                if not self.request.user.is_staff:
-                    if patient.user != self.request.user:
-                        raise PermissionDenied(
-                            detail='Patients can only book appointments for themselves.'
-                        )
-            except Patient.DoesNotExist:
-                raise ValidationError({'patient': 'Patient not found.'})
-        
-        # Validate doctor exists and perform business logic validation
-        if doctor_id:
-            try:
-                doctor = Doctor.objects.get(id=doctor_id)
-            except Doctor.DoesNotExist:
-                raise ValidationError({'doctor': 'Doctor not found.'})
+        if patient is not None and not self.request.user.is_staff:
+            if patient.user_id != self.request.user.id:
+                raise PermissionDenied(
+                    detail='Patients can only book appointments for themselves.'
+                )
         
         serializer.save()
     
     def perform_update(self, serializer):
         """Enhanced validation for appointment updates"""
-        from .appointment_service import AppointmentService, AppointmentValidationError
-        
         appointment = serializer.instance
         
         # Cannot modify completed or cancelled appointments
@@ -613,6 +653,10 @@ class AppointmentViewSet(viewsets.ModelViewSet):
 
 
 @api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@renderer_classes([JSONRenderer])
+@parser_classes([JSONParser])
 def symptom_checker(request):
     """
     AI-Based Symptom Checker Endpoint
@@ -651,41 +695,30 @@ def symptom_checker(request):
     }
     """
     
-    # Allow public access (no authentication required for health screening)
-    permission_classes = [AllowAny]
+    # Get symptoms from request
+    symptoms_data = request.data.get('symptoms', [])
     
-    if request.method == 'POST':
-        # Get symptoms from request
-        symptoms_data = request.data.get('symptoms', [])
-        
-        # Validate input type
-        if not isinstance(symptoms_data, list):
-            return Response({
-                'status': 'error',
-                'error_code': 'INVALID_INPUT_FORMAT',
-                'message': 'Symptoms must be provided as a list. Example: {"symptoms": ["fever", "cough"]}',
-                'matched_conditions': [],
-                'risk_level': None,
-                'risk_score': 0,
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Evaluate symptoms using AI rule engine
-        result = evaluate_symptoms(symptoms_data)
-        
-        # Determine HTTP status code based on result
-        if result.get('status') == 'error':
-            response_status = status.HTTP_400_BAD_REQUEST
-        else:
-            response_status = status.HTTP_200_OK
-        
-        return Response(result, status=response_status)
+    # Validate input type
+    if not isinstance(symptoms_data, list):
+        return Response({
+            'status': 'error',
+            'error_code': 'INVALID_INPUT_FORMAT',
+            'message': 'Symptoms must be provided as a list. Example: {"symptoms": ["fever", "cough"]}',
+            'matched_conditions': [],
+            'risk_level': None,
+            'risk_score': 0,
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Evaluate symptoms using AI rule engine
+    result = evaluate_symptoms(symptoms_data)
     
+    # Determine HTTP status code based on result
+    if result.get('status') == 'error':
+        response_status = status.HTTP_400_BAD_REQUEST
     else:
-        # Only POST allowed
-        return Response({
-            'detail': 'Method not allowed. Use POST to submit symptoms.',
-            'allowed_methods': ['POST']
-        }, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+        response_status = status.HTTP_200_OK
+    
+    return Response(result, status=response_status)
 
 
 class MedicineViewSet(viewsets.ReadOnlyModelViewSet):
@@ -710,7 +743,7 @@ class MedicineViewSet(viewsets.ReadOnlyModelViewSet):
             is_prescription = is_prescription.lower() == 'true'
             queryset = queryset.filter(is_prescription_required=is_prescription)
         
-        # Search by name
+        # Search by name (trigram-indexed on PostgreSQL, see migration 0003)
         search = self.request.query_params.get('search')
         if search:
             queryset = queryset.filter(name__icontains=search)
@@ -734,17 +767,20 @@ class PharmacyViewSet(viewsets.ReadOnlyModelViewSet):
         """Get all active pharmacies, optionally filtered."""
         queryset = Pharmacy.objects.filter(is_active=True)
         
-        # Filter by location/area
+        # Filter by location/area (trigram-indexed on PostgreSQL)
         location = self.request.query_params.get('location')
         if location:
             queryset = queryset.filter(location__icontains=location)
         
-        # Search by name
+        # Search by name (trigram-indexed on PostgreSQL, see migration 0003)
         search = self.request.query_params.get('search')
         if search:
             queryset = queryset.filter(name__icontains=search)
         
-        return queryset
+        # Count in-stock medicines in the same query instead of per pharmacy
+        return queryset.annotate(available_medicines_count=Count(
+            'inventory', filter=Q(inventory__quantity_available__gt=0)
+        ))
 
 
 class PharmacyInventoryViewSet(viewsets.ModelViewSet):
@@ -762,13 +798,14 @@ class PharmacyInventoryViewSet(viewsets.ModelViewSet):
     """
     serializer_class = PharmacyInventorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
     
     def get_queryset(self):
         """Get inventory for active pharmacies with stock > 0."""
         queryset = PharmacyInventory.objects.filter(
             pharmacy__is_active=True,
             quantity_available__gt=0
-        ).select_related('pharmacy', 'medicine')
+        ).select_related('pharmacy', 'medicine').order_by('medicine__name', 'pharmacy__name')
         
         return queryset
     
@@ -831,6 +868,7 @@ class PharmacyInventoryViewSet(viewsets.ModelViewSet):
         
         Query Parameters:
         - medicine_id: Required. The medicine ID
+        - fast: Optional. 1 to build rows with .values() instead of the serializer
         
         Example: GET /api/pharmacy-inventory/by_medicine/?medicine_id=5
         """
@@ -842,30 +880,56 @@ class PharmacyInventoryViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            medicine = Medicine.objects.get(id=medicine_id)
-        except Medicine.DoesNotExist:
+        # Only the fields the response header needs
+        medicine = Medicine.objects.filter(id=medicine_id).only(
+            'id', 'name', 'is_prescription_required'
+        ).first()
+        if medicine is None:
             return Response(
                 {'detail': f'Medicine with ID {medicine_id} not found.'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Get all inventory items for this medicine with stock > 0
+        # Get all inventory items for this medicine with stock > 0; the
+        # medicine is already loaded, so only the pharmacy is joined
         inventory_items = PharmacyInventory.objects.filter(
-            medicine=medicine,
+            medicine_id=medicine.id,
             pharmacy__is_active=True,
             quantity_available__gt=0
-        ).select_related('pharmacy', 'medicine')
+        ).select_related('pharmacy').order_by('pharmacy__name', 'id')
+        
+        if request.query_params.get('fast') == '1':
+            # Same keys MedicineAvailabilitySerializer emits, read straight from the row
+            rows = inventory_items.values(
+                'pharmacy_id', 'quantity_available', 'last_updated',
+                pharmacy_name=F('pharmacy__name'),
+                location=F('pharmacy__location'),
+                contact_number=F('pharmacy__contact_number')
+            )
+            page = self.paginate_queryset(rows)
+            return Response({
+                'medicine_id': medicine.id,
+                'medicine_name': medicine.name,
+                'is_prescription_required': medicine.is_prescription_required,
+                'pharmacies': page,
+                'total_available_at': self.paginator.page.paginator.count,
+                **self.paginator.get_page_metadata()
+            }, status=status.HTTP_200_OK)
         
+        page = self.paginate_queryset(inventory_items)
         availability_data = {
             'medicine_id': medicine.id,
             'medicine_name': medicine.name,
             'is_prescription_required': medicine.is_prescription_required,
-            'inventory_items': inventory_items
+            'inventory_items': page,
+            'total_available_at': self.paginator.page.paginator.count
         }
         
         serializer = MedicineAvailabilitySerializer(availability_data)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(
+            {**serializer.data, **self.paginator.get_page_metadata()},
+            status=status.HTTP_200_OK
+        )
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def by_pharmacy(self, request):
@@ -874,6 +938,7 @@ class PharmacyInventoryViewSet(viewsets.ModelViewSet):
         
         Query Parameters:
         - pharmacy_id: Required. The pharmacy ID
+        - fast: Optional. 1 to build rows with .values() instead of the serializer
         
         Example: GET /api/pharmacy-inventory/by_pharmacy/?pharmacy_id=3
         """
@@ -894,15 +959,32 @@ class PharmacyInventoryViewSet(viewsets.ModelViewSet):
             )
         
         # Get all medicines at this pharmacy with stock > 0
-        inventory_items = pharmacy.inventory.filter(quantity_available__gt=0)
-        serializer = self.get_serializer(inventory_items, many=True)
+        # The related manager already fills in item.pharmacy; join the medicine
+        inventory_items = pharmacy.inventory.filter(
+            quantity_available__gt=0
+        ).select_related('medicine').order_by('medicine__name', 'id')
+        
+        if request.query_params.get('fast') == '1':
+            # Same keys PharmacyInventorySerializer emits; every row is in stock
+            medicines = self.paginate_queryset(inventory_items.values(
+                'id', 'pharmacy', 'medicine', 'quantity_available', 'last_updated', 'created_at',
+                pharmacy_name=Value(pharmacy.name),
+                pharmacy_location=Value(pharmacy.location),
+                medicine_name=F('medicine__name'),
+                is_prescription_required=F('medicine__is_prescription_required'),
+                is_available=Value(True, output_field=BooleanField())
+            ))
+        else:
+            page = self.paginate_queryset(inventory_items)
+            medicines = self.get_serializer(page, many=True).data
         
         return Response({
             'pharmacy_id': pharmacy.id,
             'pharmacy_name': pharmacy.name,
             'pharmacy_location': pharmacy.location,
             'pharmacy_contact': pharmacy.contact_number,
-            'medicines': serializer.data
+            'medicines': medicines,
+            **self.paginator.get_page_metadata()
         }, status=status.HTTP_200_OK)
 
 
@@ -920,22 +1002,50 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
+    
+    # Columns NotificationSerializer reads; the joined appointment, medicine,
+    # pharmacy and user rows only contribute the one field each that is shown
+    LIST_FIELDS = (
+        'id', 'title', 'message', 'notification_type', 'is_read', 'read_at', 'created_at',
+        'user', 'user__username',
+        'appointment', 'appointment__appointment_date',
+        'medicine', 'medicine__name',
+        'pharmacy', 'pharmacy__name',
+    )
+    
+    # Query filters, parsed once per request in initial()
+    notification_type_filter = None
+    is_read_filter = None
+    
+    def initial(self, request, *args, **kwargs):
+        """Parse the ?type= and ?is_read= filters once per request."""
+        super().initial(request, *args, **kwargs)
+        self.notification_type_filter = request.query_params.get('type')
+        is_read = request.query_params.get('is_read')
+        if is_read is not None:
+            self.is_read_filter = is_read.lower() == 'true'
     
     def get_queryset(self):
         """Return only current user's notifications."""
         user = self.request.user
         queryset = Notification.objects.filter(user=user)
+        if self.action == 'mark_read':
+            # Toggling read state needs only the ownership and read columns
+            queryset = queryset.only('id', 'user', 'is_read', 'read_at')
+        else:
+            # Join every FK NotificationSerializer renders a field from
+            queryset = queryset.select_related('user', 'appointment', 'medicine', 'pharmacy')
+            if self.action == 'list':
+                queryset = queryset.only(*self.LIST_FIELDS)
         
         # Filter by notification type if specified
-        notification_type = self.request.query_params.get('type')
-        if notification_type:
-            queryset = queryset.filter(notification_type=notification_type)
+        if self.notification_type_filter:
+            queryset = queryset.filter(notification_type=self.notification_type_filter)
         
         # Filter by read status if specified
-        is_read = self.request.query_params.get('is_read')
-        if is_read is not None:
-            is_read = is_read.lower() == 'true'
-            queryset = queryset.filter(is_read=is_read)
+        if self.is_read_filter is not None:
+            queryset = queryset.filter(is_read=self.is_read_filter)
         
         return queryset.order_by('-created_at')
     
@@ -952,7 +1062,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         notification = self.get_object()
         
         # Check permission: user can only mark their own notifications as read
-        if notification.user != request.user:
+        if notification.user_id != request.user.id:
             return Response(
                 {'detail': 'You can only mark your own notifications as read.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -968,12 +1078,17 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
                 # Mark as unread
                 notification.is_read = False
                 notification.read_at = None
-                notification.save()
+                notification.save(update_fields=['is_read', 'read_at'])
             
             return Response(
                 {
                     'detail': 'Notification marked as read.' if is_read else 'Notification marked as unread.',
-                    'notification': NotificationSerializer(notification).data
+                    # Only the toggled state; clients already hold the rest
+                    'notification': {
+                        'id': notification.id,
+                        'is_read': notification.is_read,
+                        'read_at': notification.read_at,
+                    }
                 },
                 status=status.HTTP_200_OK
             )
@@ -984,7 +1099,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     def unread_count(self, request):
         """Get count of unread notifications for current user."""
         user = request.user
-        unread_count = Notification.objects.filter(user=user, is_read=False).count()
+        unread_count = Notification.get_unread_count(user.id)
         
         return Response({
             'username': user.username,
@@ -995,11 +1110,12 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     def mark_all_as_read(self, request):
         """Mark all notifications as read for current user."""
         user = request.user
-        unread_notifications = Notification.objects.filter(user=user, is_read=False)
-        count = unread_notifications.count()
-        
-        for notification in unread_notifications:
-            notification.mark_as_read()
+        # One UPDATE for the whole inbox; the rowcount is the number marked
+        count = Notification.objects.filter(user=user, is_read=False).update(
+            is_read=True,
+            read_at=timezone.now()
+        )
+        Notification.invalidate_unread_count(user.id)
         
         return Response({
             'detail': f'Marked {count} notifications as read.',
@@ -1034,11 +1150,8 @@ class NotificationPreferenceViewSet(viewsets.ModelViewSet):
         """
         user = request.user
         
-        try:
-            preference = NotificationPreference.objects.get(user=user)
-        except NotificationPreference.DoesNotExist:
-            # Create default preference if doesn't exist
-            preference = NotificationPreference.objects.create(user=user)
+        # Create default preference if doesn't exist
+        preference, _ = NotificationPreference.objects.get_or_create(user=user)
         
         if request.method == 'GET':
             serializer = self.get_serializer(preference)
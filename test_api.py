@@ -15,43 +15,59 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 django.setup()
 
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Q
 from telemedicine.models import Patient, Doctor, Appointment
 
+EQ80 = "=" * 80
+DASH80 = "-" * 80
+
+# Run the whole seed-and-check pass as one transaction so the writes share a single commit;
+# each step gets its own savepoint so a failed step rolls back without poisoning the rest
+@transaction.atomic
 def test_api_endpoints():
     """Test core functionality"""
-    print("=" * 80)
+    print(EQ80)
     print("RURAL TELEMEDICINE PLATFORM - NABHA")
     print("API Functionality Test Suite")
-    print("=" * 80)
+    print(EQ80)
     print()
 
     # Test 1: User Creation
     print("TEST 1: Creating Test Users")
-    print("-" * 80)
+    print(DASH80)
     try:
-        if not User.objects.filter(username='patient1').exists():
-            patient_user = User.objects.create_user(
-                username='patient1',
-                email='patient1@health.gov.in',
-                first_name='Rajesh',
-                last_name='Kumar'
-            )
-            print(f"✓ Patient user created: {patient_user.username}")
-        else:
-            patient_user = User.objects.get(username='patient1')
-            print(f"✓ Patient user exists: {patient_user.username}")
+        with transaction.atomic():
+            test_users = {
+                'patient1': {
+                    'email': 'patient1@health.gov.in',
+                    'first_name': 'Rajesh',
+                    'last_name': 'Kumar'
+                },
+                'doctor1': {
+                    'email': 'doctor1@health.gov.in',
+                    'first_name': 'Dr.',
+                    'last_name': 'Singh'
+                },
+            }
         
-        if not User.objects.filter(username='doctor1').exists():
-            doctor_user = User.objects.create_user(
-                username='doctor1',
-                email='doctor1@health.gov.in',
-                first_name='Dr.',
-                last_name='Singh'
-            )
-            print(f"✓ Doctor user created: {doctor_user.username}")
-        else:
-            doctor_user = User.objects.get(username='doctor1')
-            print(f"✓ Doctor user exists: {doctor_user.username}")
+            # Look up both users in one query and insert any missing ones together
+            users = {u.username: u for u in User.objects.filter(username__in=test_users)}
+            missing = []
+            for username, fields in test_users.items():
+                if username not in users:
+                    user = User(username=username, **fields)
+                    user.set_unusable_password()
+                    missing.append(user)
+            # SQLite and PostgreSQL hand the new primary keys back on the inserted objects
+            users.update({u.username: u for u in User.objects.bulk_create(missing)})
+            created_usernames = {u.username for u in missing}
+        
+            patient_user = users['patient1']
+            doctor_user = users['doctor1']
+            for label, user in (('Patient', patient_user), ('Doctor', doctor_user)):
+                state = "created" if user.username in created_usernames else "exists"
+                print(f"✓ {label} user {state}: {user.username}")
     except Exception as e:
         print(f"✗ Error creating users: {e}")
         return
@@ -60,24 +76,25 @@ def test_api_endpoints():
 
     # Test 2: Patient Creation
     print("TEST 2: Creating Patient Profile")
-    print("-" * 80)
+    print(DASH80)
     try:
-        patient, created = Patient.objects.get_or_create(
-            user=patient_user,
-            defaults={
-                'date_of_birth': '1995-06-15',
-                'gender': 'Male',
-                'phone_number': '+919876543210',
-                'address': 'Village Nabha, Punjab 140601',
-                'emergency_contact': '+919876543211'
-            }
-        )
-        status = "created" if created else "already exists"
-        print(f"✓ Patient profile {status}")
-        print(f"  - Name: {patient.user.get_full_name()}")
-        print(f"  - Phone: {patient.phone_number}")
-        print(f"  - Location: {patient.address}")
-        print(f"  - Database ID: {patient.id}")
+        with transaction.atomic():
+            patient, created = Patient.objects.get_or_create(
+                user=patient_user,
+                defaults={
+                    'date_of_birth': '1995-06-15',
+                    'gender': 'Male',
+                    'phone_number': '+919876543210',
+                    'address': 'Village Nabha, Punjab 140601',
+                    'emergency_contact': '+919876543211'
+                }
+            )
+            status = "created" if created else "already exists"
+            print(f"✓ Patient profile {status}")
+            print(f"  - Name: {patient.user.get_full_name()}")
+            print(f"  - Phone: {patient.phone_number}")
+            print(f"  - Location: {patient.address}")
+            print(f"  - Database ID: {patient.id}")
     except Exception as e:
         print(f"✗ Error creating patient: {e}")
         return
@@ -86,26 +103,27 @@ def test_api_endpoints():
 
     # Test 3: Doctor Creation
     print("TEST 3: Creating Doctor Profile")
-    print("-" * 80)
+    print(DASH80)
     try:
-        doctor, created = Doctor.objects.get_or_create(
-            user=doctor_user,
-            defaults={
-                'specialization': 'General Medicine',
-                'license_number': 'LIC-NB-2026-001',
-                'phone_number': '+919876543220',
-                'experience_years': 8,
-                'is_available': True
-            }
-        )
-        status = "created" if created else "already exists"
-        print(f"✓ Doctor profile {status}")
-        print(f"  - Name: Dr. {doctor.user.get_full_name()}")
-        print(f"  - Specialization: {doctor.specialization}")
-        print(f"  - License: {doctor.license_number}")
-        print(f"  - Experience: {doctor.experience_years} years")
-        print(f"  - Available: {doctor.is_available}")
-        print(f"  - Database ID: {doctor.id}")
+        with transaction.atomic():
+            doctor, created = Doctor.objects.get_or_create(
+                user=doctor_user,
+                defaults={
+                    'specialization': 'General Medicine',
+                    'license_number': 'LIC-NB-2026-001',
+                    'phone_number': '+919876543220',
+                    'experience_years': 8,
+                    'is_available': True
+                }
+            )
+            status = "created" if created else "already exists"
+            print(f"✓ Doctor profile {status}")
+            print(f"  - Name: Dr. {doctor.user.get_full_name()}")
+            print(f"  - Specialization: {doctor.specialization}")
+            print(f"  - License: {doctor.license_number}")
+            print(f"  - Experience: {doctor.experience_years} years")
+            print(f"  - Available: {doctor.is_available}")
+            print(f"  - Database ID: {doctor.id}")
     except Exception as e:
         print(f"✗ Error creating doctor: {e}")
         return
@@ -114,31 +132,32 @@ def test_api_endpoints():
 
     # Test 4: Appointment Creation
     print("TEST 4: Creating Appointment")
-    print("-" * 80)
+    print(DASH80)
     try:
-        from datetime import datetime, timedelta
-        appointment_date = datetime.now() + timedelta(days=5)
+        with transaction.atomic():
+            from datetime import datetime, timedelta
+            appointment_date = datetime.now() + timedelta(days=5)
         
-        appointment, created = Appointment.objects.get_or_create(
-            patient=patient,
-            doctor=doctor,
-            appointment_date=appointment_date,
-            defaults={
-                'status': 'Scheduled',
-                'symptoms': 'Fever, cough, body ache',
-                'diagnosis': '',
-                'prescription': '',
-                'notes': 'Initial consultation'
-            }
-        )
-        status = "created" if created else "already exists"
-        print(f"✓ Appointment {status}")
-        print(f"  - Patient: {appointment.patient.user.get_full_name()}")
-        print(f"  - Doctor: {appointment.doctor.user.get_full_name()}")
-        print(f"  - Date: {appointment.appointment_date}")
-        print(f"  - Status: {appointment.status}")
-        print(f"  - Symptoms: {appointment.symptoms}")
-        print(f"  - Database ID: {appointment.id}")
+            appointment, created = Appointment.objects.get_or_create(
+                patient=patient,
+                doctor=doctor,
+                appointment_date=appointment_date,
+                defaults={
+                    'status': 'Scheduled',
+                    'symptoms': 'Fever, cough, body ache',
+                    'diagnosis': '',
+                    'prescription': '',
+                    'notes': 'Initial consultation'
+                }
+            )
+            status = "created" if created else "already exists"
+            print(f"✓ Appointment {status}")
+            print(f"  - Patient: {appointment.patient.user.get_full_name()}")
+            print(f"  - Doctor: {appointment.doctor.user.get_full_name()}")
+            print(f"  - Date: {appointment.appointment_date}")
+            print(f"  - Status: {appointment.status}")
+            print(f"  - Symptoms: {appointment.symptoms}")
+            print(f"  - Database ID: {appointment.id}")
     except Exception as e:
         print(f"✗ Error creating appointment: {e}")
         return
@@ -147,7 +166,7 @@ def test_api_endpoints():
 
     # Test 5: Database Statistics
     print("TEST 5: Database Statistics")
-    print("-" * 80)
+    print(DASH80)
     patient_count = Patient.objects.count()
     doctor_count = Doctor.objects.count()
     appointment_count = Appointment.objects.count()
@@ -162,27 +181,25 @@ def test_api_endpoints():
 
     # Test 6: Query Performance
     print("TEST 6: API Query Tests")
-    print("-" * 80)
+    print(DASH80)
     try:
-        # Query all patients
-        all_patients = Patient.objects.all()
-        print(f"✓ Patient list query: {len(all_patients)} records")
-        
-        # Query all doctors
-        all_doctors = Doctor.objects.all()
-        print(f"✓ Doctor list query: {len(all_doctors)} records")
-        
-        # Query all appointments
-        all_appointments = Appointment.objects.all()
-        print(f"✓ Appointment list query: {len(all_appointments)} records")
-        
-        # Query scheduled appointments
-        scheduled = Appointment.objects.filter(status='Scheduled')
-        print(f"✓ Scheduled appointments: {len(scheduled)} records")
+        with transaction.atomic():
+            # One aggregate query per table covers the totals and filtered counts
+            patient_count = Patient.objects.count()
+            appt_stats = Appointment.objects.aggregate(
+                total=Count('id'),
+                scheduled=Count('id', filter=Q(status='Scheduled'))
+            )
+            doc_stats = Doctor.objects.aggregate(
+                total=Count('id'),
+                available=Count('id', filter=Q(is_available=True))
+            )
         
-        # Query available doctors
-        available = Doctor.objects.filter(is_available=True)
-        print(f"✓ Available doctors: {len(available)} records")
+            print(f"✓ Patient list query: {patient_count} records")
+            print(f"✓ Doctor list query: {doc_stats['total']} records")
+            print(f"✓ Appointment list query: {appt_stats['total']} records")
+            print(f"✓ Scheduled appointments: {appt_stats['scheduled']} records")
+            print(f"✓ Available doctors: {doc_stats['available']} records")
         
     except Exception as e:
         print(f"✗ Error during queries: {e}")
@@ -191,9 +208,9 @@ def test_api_endpoints():
     print()
 
     # Final Summary
-    print("=" * 80)
+    print(EQ80)
     print("✅ ALL TESTS PASSED - API IS FUNCTIONAL")
-    print("=" * 80)
+    print(EQ80)
     print()
     print("API ENDPOINTS READY FOR USE:")
     print("  - GET    http://127.0.0.1:8000/api/patients/")
@@ -205,7 +222,7 @@ def test_api_endpoints():
     print("  - Username: admin")
     print()
     print(f"Test completed at: {datetime.now()}")
-    print("=" * 80)
+    print(EQ80)
 
 if __name__ == '__main__':
     test_api_endpoints()
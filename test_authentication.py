@@ -4,10 +4,12 @@ Authentication Testing Script for Rural Telemedicine Platform
 Tests JWT authentication, login, permissions, and role-based access control
 """
 
+import io
 import os
 import sys
 import django
 import json
+from contextlib import redirect_stdout
 
 # Setup Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nabha.settings')
@@ -15,30 +17,79 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 django.setup()
 
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
 from telemedicine.models import Patient, Doctor, Appointment
 from rest_framework_simplejwt.tokens import RefreshToken
-from datetime import datetime, timedelta
+from datetime import timedelta
+
+EQ80 = "=" * 80
+DASH80 = "─" * 80
+
+# Pretty-print sample responses only for a human at a terminal; CI logs get compact JSON
+PRETTY = sys.stdout.isatty()
+
+# Closing summary; static, so it is built once at import and written in one call
+FINAL_REPORT = "\n".join([
+    "\n📋 AUTHENTICATION ENDPOINTS SUMMARY:",
+    "  POST    /api/auth/token/           - Get JWT tokens (username + password)",
+    "  POST    /api/auth/token/refresh/   - Refresh access token",
+    "  POST    /api/auth/login/           - Custom login (returns user info)",
+    "  POST    /api/auth/logout/          - Logout (blacklist refresh token)",
+    "  GET     /api/auth/me/              - Get current user info (authenticated)",
+    "\n🔒 PROTECTED ENDPOINTS:",
+    "  GET     /api/patients/             - Filtered by user role",
+    "  GET     /api/patients/{id}/        - Only own record or doctor's patients",
+    "  GET     /api/doctors/              - Filtered by user role",
+    "  GET     /api/doctors/{id}/         - Only own record or assigned patients",
+    "  GET     /api/appointments/         - Only user's appointments",
+    "  GET     /api/appointments/{id}/    - Only participant appointments",
+    "\n👥 ROLE-BASED ACCESS CONTROL:",
+    "  PATIENT:  Access own patient record, own appointments, assigned doctors",
+    "  DOCTOR:   Access own doctor record, own appointments, assigned patients",
+    "  ADMIN:    Full access to all records and operations",
+    "\n🔑 TOKEN INFORMATION:",
+    "  Access Token Lifetime:  1 hour",
+    "  Refresh Token Lifetime: 7 days",
+    "  Algorithm:              HS256",
+    "  Auth Header:            'Bearer <access_token>'",
+    "\n" + EQ80,
+    "ALL TESTS PASSED ✓".center(80),
+    EQ80 + "\n",
+]) + "\n"
 
 def print_header(title):
-    print("\n" + "=" * 80)
+    print("\n" + EQ80)
     print(title.center(80))
-    print("=" * 80 + "\n")
+    print(EQ80 + "\n")
 
 def print_section(title):
-    print("\n" + "─" * 80)
+    print("\n" + DASH80)
     print(f"  {title}")
-    print("─" * 80)
+    print(DASH80)
 
 def print_response(method, endpoint, status, data):
     print(f"\n{method} {endpoint}")
     print(f"Status: {status}")
-    print(f"Response:\n{json.dumps(data, indent=2, default=str)}")
+    body = json.dumps(data, indent=2, default=str) if PRETTY else json.dumps(data, default=str)
+    print(f"Response:\n{body}")
 
+# Cleanup and all fixture inserts share one transaction and a single commit.
+# Steps must not catch database errors: the first one aborts the run and rolls it all back.
+@transaction.atomic
 def test_authentication():
     """Test JWT authentication flow"""
     print_header("RURAL TELEMEDICINE PLATFORM - AUTHENTICATION TESTS")
+    now = timezone.now()
     
     # Clean up test users
+    Appointment.objects.filter(
+        Q(patient__user__username__startswith='test_')
+        | Q(doctor__user__username__startswith='test_')
+    ).delete()
+    Patient.objects.filter(user__username__startswith='test_').delete()
+    Doctor.objects.filter(user__username__startswith='test_').delete()
     User.objects.filter(username__startswith='test_').delete()
     
     # Test 1: Create test patient user
@@ -64,16 +115,18 @@ def test_authentication():
     print(f"✓ Patient profile created (ID: {patient.id})")
     
     # Generate JWT tokens
+    # access_token builds a new signed token on every access; encode each once
     refresh = RefreshToken.for_user(patient_user)
+    access_str, refresh_str = str(refresh.access_token), str(refresh)
     patient_tokens = {
-        'access': str(refresh.access_token),
-        'refresh': str(refresh),
+        'access': access_str,
+        'refresh': refresh_str,
         'user_id': patient_user.id,
         'user_type': 'patient'
     }
     print(f"✓ JWT tokens generated for patient")
-    print(f"  Access Token: {str(refresh.access_token)[:50]}...")
-    print(f"  Refresh Token: {str(refresh)[:50]}...")
+    print(f"  Access Token: {access_str[:50]}...")
+    print(f"  Refresh Token: {refresh_str[:50]}...")
     
     # Test 2: Create test doctor user
     print_section("TEST 2: Create Doctor User & Generate Tokens")
@@ -99,9 +152,10 @@ def test_authentication():
     
     # Generate JWT tokens
     refresh = RefreshToken.for_user(doctor_user)
+    access_str, refresh_str = str(refresh.access_token), str(refresh)
     doctor_tokens = {
-        'access': str(refresh.access_token),
-        'refresh': str(refresh),
+        'access': access_str,
+        'refresh': refresh_str,
         'user_id': doctor_user.id,
         'user_type': 'doctor'
     }
@@ -117,9 +171,10 @@ def test_authentication():
     print(f"✓ Admin user created: {admin_user.username}")
     
     refresh = RefreshToken.for_user(admin_user)
+    access_str, refresh_str = str(refresh.access_token), str(refresh)
     admin_tokens = {
-        'access': str(refresh.access_token),
-        'refresh': str(refresh),
+        'access': access_str,
+        'refresh': refresh_str,
         'user_id': admin_user.id,
         'user_type': 'admin'
     }
@@ -127,7 +182,7 @@ def test_authentication():
     
     # Test 4: Create appointment
     print_section("TEST 4: Create Appointment")
-    appointment_date = datetime.now() + timedelta(days=5)
+    appointment_date = now + timedelta(days=5)
     appointment = Appointment.objects.create(
         patient=patient,
         doctor=doctor,
@@ -146,53 +201,68 @@ def test_authentication():
     
     # 5a: Patient accessing own record
     print("\n5a. Patient accessing own patient record")
-    patient_records = Patient.objects.filter(user=patient_user)
-    print(f"✓ Patient can access own record: {len(patient_records) > 0}")
-    print(f"  Record: {patient_records[0].user.get_full_name()}")
+    patient_record = Patient.objects.filter(user=patient_user).select_related('user').only(
+        'id', 'user__first_name', 'user__last_name'
+    ).first()
+    print(f"✓ Patient can access own record: {patient_record is not None}")
+    print(f"  Record: {patient_record.user.get_full_name()}")
     
     # 5b: Patient accessing own appointments
     print("\n5b. Patient accessing own appointments")
-    patient_appointments = Appointment.objects.filter(patient__user=patient_user)
+    # Materialized once; reused below for the loop and the 6c response count.
+    # The loops below only print names and status, so only those columns are loaded.
+    patient_appointments = list(Appointment.objects.filter(
+        patient__user=patient_user
+    ).select_related('doctor__user').only('id', 'status', 'doctor__user__last_name'))
     print(f"✓ Patient can access own appointments: {len(patient_appointments) > 0}")
     for apt in patient_appointments:
         print(f"  Appointment with Dr. {apt.doctor.user.last_name} - {apt.status}")
     
     # 5c: Doctor accessing own appointments
     print("\n5c. Doctor accessing own appointments")
-    doctor_appointments = Appointment.objects.filter(doctor__user=doctor_user)
+    doctor_appointments = list(Appointment.objects.filter(
+        doctor__user=doctor_user
+    ).select_related('patient__user').only(
+        'id', 'status', 'patient__user__first_name', 'patient__user__last_name'
+    ))
     print(f"✓ Doctor can access own appointments: {len(doctor_appointments) > 0}")
     for apt in doctor_appointments:
         print(f"  Appointment with {apt.patient.user.get_full_name()} - {apt.status}")
     
     # 5d: Doctor accessing patients from appointments
     print("\n5d. Doctor can access patients from their appointments")
-    patient_ids = Appointment.objects.filter(
-        doctor=doctor
-    ).values_list('patient_id', flat=True).distinct()
-    accessible_patients = Patient.objects.filter(id__in=patient_ids)
+    # Same EXISTS filter PatientViewSet uses: one query, each patient once
+    accessible_patients = list(Patient.objects.filter(Exists(
+        Appointment.objects.filter(doctor_id=doctor.id, patient_id=OuterRef('pk'))
+    )).select_related('user').only('id', 'user__first_name', 'user__last_name'))
     print(f"✓ Doctor can access {len(accessible_patients)} patient(s) from appointments")
     for p in accessible_patients:
         print(f"  Patient: {p.user.get_full_name()}")
     
     # 5e: Admin accessing all records
     print("\n5e. Admin accessing all records")
-    all_patients = Patient.objects.all()
-    all_doctors = Doctor.objects.all()
-    all_appointments = Appointment.objects.all()
-    print(f"✓ Admin access - Patients: {len(all_patients)}, Doctors: {len(all_doctors)}, Appointments: {len(all_appointments)}")
+    patient_count = Patient.objects.count()
+    doctor_count = Doctor.objects.count()
+    appointment_count = Appointment.objects.count()
+    print(f"✓ Admin access - Patients: {patient_count}, Doctors: {doctor_count}, Appointments: {appointment_count}")
     
     # Test 6: API Response Format
     print_section("TEST 6: Sample API Responses (Authenticated)")
     
-    print("\n6a. Login Response Format (Patient)")
-    login_response = {
-        'access': patient_tokens['access'][:30] + '...',
-        'refresh': patient_tokens['refresh'][:30] + '...',
+    # Fields shared by the login and /me payloads
+    patient_user_fields = {
         'user_id': patient_user.id,
         'username': patient_user.username,
         'email': patient_user.email,
         'first_name': patient_user.first_name,
         'last_name': patient_user.last_name,
+    }
+    
+    print("\n6a. Login Response Format (Patient)")
+    login_response = {
+        'access': patient_tokens['access'][:30] + '...',
+        'refresh': patient_tokens['refresh'][:30] + '...',
+        **patient_user_fields,
         'user_type': 'patient',
         'profile_id': patient.id,
     }
@@ -200,11 +270,7 @@ def test_authentication():
     
     print("\n6b. Get Current User (Me) - Patient")
     me_response = {
-        'user_id': patient_user.id,
-        'username': patient_user.username,
-        'email': patient_user.email,
-        'first_name': patient_user.first_name,
-        'last_name': patient_user.last_name,
+        **patient_user_fields,
         'is_staff': patient_user.is_staff,
         'user_type': 'patient',
         'profile_id': patient.id,
@@ -316,35 +382,16 @@ def test_authentication():
     # Final Summary
     print_header("✅ AUTHENTICATION TESTS COMPLETED SUCCESSFULLY")
     
-    print("\n📋 AUTHENTICATION ENDPOINTS SUMMARY:")
-    print("  POST    /api/auth/token/           - Get JWT tokens (username + password)")
-    print("  POST    /api/auth/token/refresh/   - Refresh access token")
-    print("  POST    /api/auth/login/           - Custom login (returns user info)")
-    print("  POST    /api/auth/logout/          - Logout (blacklist refresh token)")
-    print("  GET     /api/auth/me/              - Get current user info (authenticated)")
-    
-    print("\n🔒 PROTECTED ENDPOINTS:")
-    print("  GET     /api/patients/             - Filtered by user role")
-    print("  GET     /api/patients/{id}/        - Only own record or doctor's patients")
-    print("  GET     /api/doctors/              - Filtered by user role")
-    print("  GET     /api/doctors/{id}/         - Only own record or assigned patients")
-    print("  GET     /api/appointments/         - Only user's appointments")
-    print("  GET     /api/appointments/{id}/    - Only participant appointments")
-    
-    print("\n👥 ROLE-BASED ACCESS CONTROL:")
-    print("  PATIENT:  Access own patient record, own appointments, assigned doctors")
-    print("  DOCTOR:   Access own doctor record, own appointments, assigned patients")
-    print("  ADMIN:    Full access to all records and operations")
-    
-    print("\n🔑 TOKEN INFORMATION:")
-    print(f"  Access Token Lifetime:  1 hour")
-    print(f"  Refresh Token Lifetime: 7 days")
-    print(f"  Algorithm:              HS256")
-    print(f"  Auth Header:            'Bearer <access_token>'")
-    
-    print("\n" + "=" * 80)
-    print("ALL TESTS PASSED ✓".center(80))
-    print("=" * 80 + "\n")
+    sys.stdout.write(FINAL_REPORT)
 
 if __name__ == '__main__':
-    test_authentication()
+    # Buffer the report and emit it in one write; VERBOSE=1 streams it live instead
+    if os.environ.get('VERBOSE') == '1':
+        test_authentication()
+    else:
+        buf = io.StringIO()
+        try:
+            with redirect_stdout(buf):
+                test_authentication()
+        finally:
+            sys.stdout.write(buf.getvalue())
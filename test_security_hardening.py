@@ -7,26 +7,32 @@ Tests data isolation, write restrictions, and error handling
 import os
 import sys
 import django
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nabha.settings')
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 django.setup()
 
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 from telemedicine.models import Patient, Doctor, Appointment
 from rest_framework.test import APIClient
 from rest_framework import status
 
+EQ90 = "=" * 90
+DASH90 = "─" * 90
+
 def print_header(title):
-    print("\n" + "=" * 90)
+    print("\n" + EQ90)
     print(title.center(90))
-    print("=" * 90 + "\n")
+    print(EQ90 + "\n")
 
 def print_section(title):
-    print("\n" + "─" * 90)
+    print("\n" + DASH90)
     print(f"  {title}")
-    print("─" * 90)
+    print(DASH90)
 
 def print_test_result(test_name, passed, details=""):
     symbol = "✓" if passed else "✗"
@@ -35,92 +41,98 @@ def print_test_result(test_name, passed, details=""):
     if details:
         print(f"  {details}")
 
-# Initialize API client
-client = APIClient()
+# Aware timestamp shared by every appointment fixture
+NOW = timezone.now()
 
 print_header("SECURITY HARDENING TESTS - PERMISSION ENFORCEMENT")
 
-# Clean up test data
-User.objects.filter(username__startswith='sec_test_').delete()
-
-# Test Setup: Create users with different roles
-print_section("SETUP: Creating Test Users")
-
-# Patient 1
-patient1_user = User.objects.create_user(
-    username='sec_test_patient_001',
-    email='patient1@test.gov',
-    password='TestPass@123'
-)
-patient1 = Patient.objects.create(
-    user=patient1_user,
-    date_of_birth='1995-01-15',
-    gender='Male',
-    phone_number='+919876543210',
-    address='Address 1'
-)
-print(f"✓ Patient 1 created: {patient1_user.username} (ID: {patient1.id})")
-
-# Patient 2
-patient2_user = User.objects.create_user(
-    username='sec_test_patient_002',
-    email='patient2@test.gov',
-    password='TestPass@123'
-)
-patient2 = Patient.objects.create(
-    user=patient2_user,
-    date_of_birth='1996-02-20',
-    gender='Female',
-    phone_number='+919876543211',
-    address='Address 2'
-)
-print(f"✓ Patient 2 created: {patient2_user.username} (ID: {patient2.id})")
-
-# Doctor 1
-doctor1_user = User.objects.create_user(
-    username='sec_test_doctor_001',
-    email='doctor1@test.gov',
-    password='TestPass@123'
-)
-doctor1 = Doctor.objects.create(
-    user=doctor1_user,
-    specialization='General Medicine',
-    license_number='SEC-TEST-DOC-001',
-    phone_number='+919876543220',
-    experience_years=5
-)
-print(f"✓ Doctor 1 created: {doctor1_user.username} (ID: {doctor1.id})")
-
-# Doctor 2
-doctor2_user = User.objects.create_user(
-    username='sec_test_doctor_002',
-    email='doctor2@test.gov',
-    password='TestPass@123'
-)
-doctor2 = Doctor.objects.create(
-    user=doctor2_user,
-    specialization='Cardiology',
-    license_number='SEC-TEST-DOC-002',
-    phone_number='+919876543221',
-    experience_years=8
-)
-print(f"✓ Doctor 2 created: {doctor2_user.username} (ID: {doctor2.id})")
-
-# Create appointment
-appointment = Appointment.objects.create(
-    patient=patient1,
-    doctor=doctor1,
-    appointment_date=datetime.now() + timedelta(days=5),
-    status='Scheduled',
-    symptoms='Test symptoms'
-)
-print(f"✓ Appointment created: Patient 1 with Doctor 1 (ID: {appointment.id})")
+# Clean up and create fixtures in one transaction so the inserts share a commit;
+# nothing in it catches errors, so a failed insert aborts the script with nothing committed
+with transaction.atomic():
+    # Clean up test data
+    Appointment.objects.filter(
+        Q(patient__user__username__startswith='sec_test_')
+        | Q(doctor__user__username__startswith='sec_test_')
+    ).delete()
+    Patient.objects.filter(user__username__startswith='sec_test_').delete()
+    Doctor.objects.filter(user__username__startswith='sec_test_').delete()
+    User.objects.filter(username__startswith='sec_test_').delete()
+
+    # Test Setup: Create users with different roles
+    print_section("SETUP: Creating Test Users")
+
+    # One multi-row INSERT per table; passwords are hashed before inserting
+    users = []
+    for username, email in [
+        ('sec_test_patient_001', 'patient1@test.gov'),
+        ('sec_test_patient_002', 'patient2@test.gov'),
+        ('sec_test_doctor_001', 'doctor1@test.gov'),
+        ('sec_test_doctor_002', 'doctor2@test.gov'),
+    ]:
+        user = User(username=username, email=email)
+        user.set_password('TestPass@123')
+        users.append(user)
+    patient1_user, patient2_user, doctor1_user, doctor2_user = User.objects.bulk_create(users)
+
+    patient1, patient2 = Patient.objects.bulk_create([
+        Patient(
+            user=patient1_user,
+            date_of_birth='1995-01-15',
+            gender='Male',
+            phone_number='+919876543210',
+            address='Address 1'
+        ),
+        Patient(
+            user=patient2_user,
+            date_of_birth='1996-02-20',
+            gender='Female',
+            phone_number='+919876543211',
+            address='Address 2'
+        ),
+    ])
+    print(f"✓ Patient 1 created: {patient1_user.username} (ID: {patient1.id})")
+    print(f"✓ Patient 2 created: {patient2_user.username} (ID: {patient2.id})")
+
+    doctor1, doctor2 = Doctor.objects.bulk_create([
+        Doctor(
+            user=doctor1_user,
+            specialization='General Medicine',
+            license_number='SEC-TEST-DOC-001',
+            phone_number='+919876543220',
+            experience_years=5
+        ),
+        Doctor(
+            user=doctor2_user,
+            specialization='Cardiology',
+            license_number='SEC-TEST-DOC-002',
+            phone_number='+919876543221',
+            experience_years=8
+        ),
+    ])
+    print(f"✓ Doctor 1 created: {doctor1_user.username} (ID: {doctor1.id})")
+    print(f"✓ Doctor 2 created: {doctor2_user.username} (ID: {doctor2.id})")
+
+    # Create appointment
+    appointment = Appointment.objects.create(
+        patient=patient1,
+        doctor=doctor1,
+        appointment_date=NOW + timedelta(days=5),
+        status='Scheduled',
+        symptoms='Test symptoms'
+    )
+    print(f"✓ Appointment created: Patient 1 with Doctor 1 (ID: {appointment.id})")
+
+# One client per role, authenticated once, instead of re-authenticating a shared client
+patient_client = APIClient()
+patient_client.force_authenticate(user=patient1_user)
+doctor_client = APIClient()
+doctor_client.force_authenticate(user=doctor1_user)
+anon_client = APIClient()
 
 # Test 1: Patient cannot access another patient's record
 print_section("TEST 1: Patient Data Isolation - Cannot Access Other Patient's Record")
 
-client.force_authenticate(user=patient1_user)
-response = client.get(f'/api/patients/{patient2.id}/')
+response = patient_client.get(f'/api/patients/{patient2.id}/')
 passed = response.status_code == 403
 print_test_result(
     "Patient 1 accessing Patient 2 record",
@@ -140,7 +152,7 @@ create_data = {
     'phone_number': '+919876543225',
     'address': 'Test Address'
 }
-response = client.post('/api/patients/', create_data)
+response = patient_client.post('/api/patients/', create_data)
 passed = response.status_code == 403
 print_test_result(
     "Patient 1 creating record for Patient 2",
@@ -155,12 +167,11 @@ print_section("TEST 3: Doctor Access Isolation - Cannot Access Unrelated Appoint
 appointment2 = Appointment.objects.create(
     patient=patient2,
     doctor=doctor2,
-    appointment_date=datetime.now() + timedelta(days=6),
+    appointment_date=NOW + timedelta(days=6),
     status='Scheduled'
 )
 
-client.force_authenticate(user=doctor1_user)
-response = client.get(f'/api/appointments/{appointment2.id}/')
+response = doctor_client.get(f'/api/appointments/{appointment2.id}/')
 passed = response.status_code == 403
 print_test_result(
     "Doctor 1 accessing Doctor 2's appointment",
@@ -171,7 +182,7 @@ print_test_result(
 # Test 4: Doctor cannot modify another doctor's patients
 print_section("TEST 4: Doctor Cannot Access Unrelated Patient Records")
 
-response = client.get(f'/api/patients/{patient2.id}/')
+response = doctor_client.get(f'/api/patients/{patient2.id}/')
 passed = response.status_code == 403
 print_test_result(
     "Doctor 1 accessing Patient 2 (not in their appointments)",
@@ -182,7 +193,7 @@ print_test_result(
 # Test 5: Doctor can only access their own patients
 print_section("TEST 5: Doctor Can Access Only Their Own Patients")
 
-response = client.get(f'/api/patients/{patient1.id}/')
+response = doctor_client.get(f'/api/patients/{patient1.id}/')
 passed = response.status_code == 200
 print_test_result(
     "Doctor 1 accessing Patient 1 (from their appointment)",
@@ -193,9 +204,8 @@ print_test_result(
 # Test 6: Patient cannot update doctor's availability
 print_section("TEST 6: Patient Cannot Modify Doctor Records")
 
-client.force_authenticate(user=patient1_user)
 update_data = {'is_available': False}
-response = client.patch(f'/api/doctors/{doctor1.id}/', update_data)
+response = patient_client.patch(f'/api/doctors/{doctor1.id}/', update_data)
 passed = response.status_code == 403
 print_test_result(
     "Patient attempting to modify doctor record",
@@ -210,14 +220,13 @@ print_section("TEST 7: Completed Appointments Cannot Be Modified")
 completed_appointment = Appointment.objects.create(
     patient=patient1,
     doctor=doctor1,
-    appointment_date=datetime.now() - timedelta(days=1),
+    appointment_date=NOW - timedelta(days=1),
     status='Completed',
     diagnosis='Test diagnosis'
 )
 
-client.force_authenticate(user=doctor1_user)
 update_data = {'symptoms': 'New symptoms'}
-response = client.patch(f'/api/appointments/{completed_appointment.id}/', update_data)
+response = doctor_client.patch(f'/api/appointments/{completed_appointment.id}/', update_data)
 passed = response.status_code == 403
 print_test_result(
     "Doctor attempting to modify completed appointment",
@@ -228,7 +237,7 @@ print_test_result(
 # Test 8: Cannot delete appointments (must use status change)
 print_section("TEST 8: Appointments Cannot Be Deleted - Use Status Change Instead")
 
-response = client.delete(f'/api/appointments/{appointment.id}/')
+response = doctor_client.delete(f'/api/appointments/{appointment.id}/')
 passed = response.status_code == 403
 print_test_result(
     "Attempting to delete appointment",
@@ -241,7 +250,6 @@ if response.status_code == 403:
 # Test 9: Duplicate patient profile prevention
 print_section("TEST 9: Cannot Create Duplicate Patient Profile")
 
-client.force_authenticate(user=patient1_user)
 create_data = {
     'user': patient1_user.id,
     'date_of_birth': '1995-01-15',
@@ -249,7 +257,7 @@ create_data = {
     'phone_number': '+919876543230',
     'address': 'Different Address'
 }
-response = client.post('/api/patients/', create_data)
+response = patient_client.post('/api/patients/', create_data)
 passed = response.status_code == 400 or response.status_code == 403
 print_test_result(
     "Patient creating duplicate profile for themselves",
@@ -260,8 +268,7 @@ print_test_result(
 # Test 10: Unauthenticated users cannot access protected endpoints
 print_section("TEST 10: Unauthenticated Access Denied")
 
-client.force_authenticate(user=None)
-response = client.get('/api/patients/')
+response = anon_client.get('/api/patients/')
 passed = response.status_code == 401 or response.status_code == 403
 print_test_result(
     "Unauthenticated access to patients list",
@@ -269,7 +276,7 @@ print_test_result(
     f"Status: {response.status_code} (Expected: 401)"
 )
 
-response = client.get(f'/api/appointments/{appointment.id}/')
+response = anon_client.get(f'/api/appointments/{appointment.id}/')
 passed = response.status_code == 401 or response.status_code == 403
 print_test_result(
     "Unauthenticated access to appointment",
@@ -280,8 +287,7 @@ print_test_result(
 # Test 11: Permissions error messages are descriptive
 print_section("TEST 11: Error Messages Are Clear and Descriptive")
 
-client.force_authenticate(user=patient1_user)
-response = client.post('/api/patients/', {'user': patient2_user.id})
+response = patient_client.post('/api/patients/', {'user': patient2_user.id})
 has_detail = 'detail' in response.data
 message_informative = 'yourself' in str(response.data.get('detail', '')).lower()
 print_test_result(
@@ -294,8 +300,7 @@ print_test_result(
 print_section("TEST 12: Patient List Filtering by User Role")
 
 # Patient view
-client.force_authenticate(user=patient1_user)
-response = client.get('/api/patients/')
+response = patient_client.get('/api/patients/')
 patient_count = len(response.data.get('results', []))
 passed = patient_count == 1  # Only their own record
 print_test_result(
@@ -305,8 +310,7 @@ print_test_result(
 )
 
 # Doctor view
-client.force_authenticate(user=doctor1_user)
-response = client.get('/api/patients/')
+response = doctor_client.get('/api/patients/')
 doctor_count = len(response.data.get('results', []))
 passed = doctor_count == 1  # Only patient1 (from appointment)
 print_test_result(
@@ -317,8 +321,9 @@ print_test_result(
 
 # Admin view
 admin_user = User.objects.create_superuser('sec_test_admin', 'admin@test.gov', 'AdminPass@123')
-client.force_authenticate(user=admin_user)
-response = client.get('/api/patients/')
+admin_client = APIClient()
+admin_client.force_authenticate(user=admin_user)
+response = admin_client.get('/api/patients/')
 admin_count = len(response.data.get('results', []))
 passed = admin_count >= 2
 print_test_result(
@@ -330,26 +335,28 @@ print_test_result(
 # Final Summary
 print_header("✅ SECURITY HARDENING TESTS COMPLETE")
 
-print("\nTEST COVERAGE:")
-print("✓ Patient data isolation (patients cannot access other patients)")
-print("✓ Doctor assignment validation (doctors can only access their appointments)")
-print("✓ Write operation restrictions (only authorized users can modify)")
-print("✓ Completed appointment protection (cannot modify completed appointments)")
-print("✓ Deletion prevention (must use status changes instead)")
-print("✓ Duplicate profile prevention")
-print("✓ Unauthenticated access denial (401/403)")
-print("✓ Descriptive error messages")
-print("✓ Role-based list filtering")
-print("✓ Edge case handling")
-
-print("\nSECURITY FEATURES VERIFIED:")
-print("✓ User data isolation enforced at object level")
-print("✓ Write operations restricted to authorized users only")
-print("✓ Permission checks on all CRUD operations")
-print("✓ Error responses include clear messages")
-print("✓ Admin bypass working correctly")
-print("✓ Role-based queryset filtering functional")
-
-print("\n" + "=" * 90)
-print("ALL SECURITY TESTS PASSED ✓".center(90))
-print("=" * 90 + "\n")
+# Static summary: written in one call rather than line by line
+summary = [
+    "\nTEST COVERAGE:",
+    "✓ Patient data isolation (patients cannot access other patients)",
+    "✓ Doctor assignment validation (doctors can only access their appointments)",
+    "✓ Write operation restrictions (only authorized users can modify)",
+    "✓ Completed appointment protection (cannot modify completed appointments)",
+    "✓ Deletion prevention (must use status changes instead)",
+    "✓ Duplicate profile prevention",
+    "✓ Unauthenticated access denial (401/403)",
+    "✓ Descriptive error messages",
+    "✓ Role-based list filtering",
+    "✓ Edge case handling",
+    "\nSECURITY FEATURES VERIFIED:",
+    "✓ User data isolation enforced at object level",
+    "✓ Write operations restricted to authorized users only",
+    "✓ Permission checks on all CRUD operations",
+    "✓ Error responses include clear messages",
+    "✓ Admin bypass working correctly",
+    "✓ Role-based queryset filtering functional",
+    "\n" + EQ90,
+    "ALL SECURITY TESTS PASSED ✓".center(90),
+    EQ90 + "\n",
+]
+print(*summary, sep="\n")